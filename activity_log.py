@@ -0,0 +1,70 @@
+import logging
+import queue
+import threading
+from collections import deque
+from datetime import datetime
+from logging.handlers import QueueListener, RotatingFileHandler
+
+
+class ActivityLog:
+    # Any thread may post(); entries wait in a SimpleQueue until the Tk thread
+    # drains them. The last `capacity` entries live in memory for the UI.
+    # Anything pushed out of the ring is queued to a listener thread that
+    # appends it to a rotating file, so the Tk thread never waits on disk.
+
+    def __init__(self, path, capacity=500, max_bytes=1_000_000, backup_count=5):
+        self.path = path
+        self.capacity = capacity
+        self._entries = deque()
+        self._lock = threading.Lock()
+        self._incoming = queue.SimpleQueue()
+        self.spilled = 0
+        self._spill = queue.Queue()
+        self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count,
+                                            encoding="utf-8", delay=True)
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        self._listener = QueueListener(self._spill, self._handler)
+        self._listener.start()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def post(self, message):
+        self._incoming.put((datetime.now(), message))
+
+    def drain(self):
+        lines = []
+        while True:
+            try:
+                entry = self._incoming.get_nowait()
+            except queue.Empty:
+                return lines
+            with self._lock:
+                self._entries.append(entry)
+                if len(self._entries) > self.capacity:
+                    self._write(self._entries.popleft())
+            lines.append(self.format(entry))
+
+    def recent(self, count=None):
+        with self._lock:
+            entries = list(self._entries)
+        if count is not None:
+            entries = entries[-count:]
+        return [self.format(entry) for entry in entries]
+
+    def format(self, entry):
+        when, message = entry
+        return f"[{when.strftime('%H:%M:%S')}] {message}"
+
+    def close(self):
+        self.drain()
+        with self._lock:
+            while self._entries:
+                self._write(self._entries.popleft())
+        self._listener.stop()
+        self._handler.close()
+
+    def _write(self, entry):
+        when, message = entry
+        self._spill.put(logging.makeLogRecord({"msg": f"{when.isoformat(sep=' ', timespec='seconds')} {message}"}))
+        self.spilled += 1
@@ -0,0 +1,110 @@
+import queue
+import sys
+import threading
+import time
+
+try:
+    import winsound
+except ImportError:
+    winsound = None
+
+# frequency (Hz), duration (ms), gap (s), repeats
+REMINDER_BEEPS = (1000, 500, 0.3, 7)
+
+
+class WinsoundBackend:
+    def beep(self, frequency, duration_ms):
+        winsound.Beep(frequency, duration_ms)
+
+
+class BellBackend:
+    # Terminal bell for platforms without winsound. The bell has no length of
+    # its own, so wait out the duration to keep the same rhythm.
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def beep(self, frequency, duration_ms):
+        self.stream.write("\a")
+        self.stream.flush()
+        time.sleep(duration_ms / 1000)
+
+
+class SilentBackend:
+    def __init__(self):
+        self.beeps = []
+
+    def beep(self, frequency, duration_ms):
+        self.beeps.append((frequency, duration_ms))
+
+
+def default_sound_backend():
+    if winsound is not None:
+        return WinsoundBackend()
+    return BellBackend()
+
+
+class AlertQueue:
+    # Reminders are posted from the reminder thread and handled by one audio
+    # worker, so a slow sound never delays the next due dose. Everything posted
+    # within coalesce_window of the first alert, or while the previous sound
+    # was still playing, is delivered as one batch with one sound.
+
+    def __init__(self, on_alert, backend=None, pattern=REMINDER_BEEPS, coalesce_window=0.25):
+        self.on_alert = on_alert
+        self.backend = backend or default_sound_backend()
+        self.pattern = pattern
+        self.coalesce_window = coalesce_window
+        self.batches = 0
+        self.alerts = 0
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="alert-audio", daemon=True)
+        self._worker.start()
+
+    def post(self, alert):
+        self._queue.put(alert)
+
+    def stop(self, timeout=1):
+        self._stop.set()
+        self._queue.put(None)
+        self._worker.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = [first] + self._drain(time.monotonic() + self.coalesce_window)
+            if self._stop.is_set():
+                break
+
+            self.batches += 1
+            self.alerts += len(batch)
+            try:
+                self.on_alert(batch)
+            except Exception as e:
+                print(f"Error delivering reminder alert: {e}")
+            self._play()
+
+    def _drain(self, deadline):
+        batch = []
+        while True:
+            try:
+                alert = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                return batch
+            if alert is None:
+                self._stop.set()
+                return batch
+            batch.append(alert)
+
+    def _play(self):
+        frequency, duration_ms, gap, repeats = self.pattern
+        try:
+            for _ in range(repeats):
+                if self._stop.is_set():
+                    return
+                self.backend.beep(frequency, duration_ms)
+                self._stop.wait(gap)
+        except Exception as e:
+            print(f"Sound error: {e}")
@@ -0,0 +1,129 @@
+import argparse
+import csv
+import json
+import sys
+import time
+from contextlib import ExitStack
+from itertools import islice
+
+from ml_models import MODEL_DIR, load_batch_predictor
+
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def read_records(stream, fmt, id_field, symptoms_field):
+    # Yields (record id, comma-separated symptoms, error). JSONL records may
+    # hold the symptoms as a list; records without an id are numbered. A
+    # malformed record yields an error instead of ending the run.
+    if fmt == "jsonl":
+        rows = ((number, line) for number, line in enumerate(stream, 1) if line.strip())
+    else:
+        rows = enumerate(csv.DictReader(stream), 1)
+    for number, row in rows:
+        try:
+            if fmt == "jsonl":
+                row = json.loads(row)
+            if not isinstance(row, dict):
+                raise ValueError(f"expected an object, got {type(row).__name__}")
+            symptoms = row.get(symptoms_field) or ""
+            if isinstance(symptoms, list):
+                symptoms = ", ".join(str(symptom) for symptom in symptoms)
+            elif not isinstance(symptoms, str):
+                raise ValueError(f"{symptoms_field} must be a string or a list, got {type(symptoms).__name__}")
+        except ValueError as e:
+            yield number, None, f"record {number}: {e}"
+            continue
+        record_id = row.get(id_field)
+        yield number if record_id is None or record_id == "" else record_id, symptoms, None
+
+
+class JsonlWriter:
+    def __init__(self, stream, labels):
+        self.stream = stream
+        self.labels = labels
+
+    def write(self, record_id, disease, probabilities, unknown, error=None):
+        record = {"id": record_id, "disease": disease}
+        if error:
+            record["error"] = error
+        if probabilities is not None:
+            record["probability"] = round(float(probabilities.max()), 4)
+            record["probabilities"] = {label: round(float(p), 4) for label, p in zip(self.labels, probabilities)}
+        if unknown:
+            record["unknown_symptoms"] = unknown
+        self.stream.write(json.dumps(record) + "\n")
+
+
+class CsvWriter:
+    def __init__(self, stream, labels):
+        self.writer = csv.writer(stream)
+        self.writer.writerow(["id", "disease", "probability", *labels, "unknown_symptoms", "error"])
+        self.width = len(labels)
+
+    def write(self, record_id, disease, probabilities, unknown, error=None):
+        if probabilities is None:
+            scores = [""] * (self.width + 1)
+        else:
+            scores = [f"{p:.4f}" for p in (probabilities.max(), *probabilities)]
+        self.writer.writerow([record_id, disease or "", *scores, ", ".join(unknown), error or ""])
+
+
+def detect_format(path, given):
+    if given:
+        return given
+    return "jsonl" if path.endswith((".jsonl", ".json")) else "csv"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predict diseases for a file of patient symptom lists")
+    parser.add_argument("input", help="CSV or JSONL file of symptom records, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="where to write predictions (default: stdout)")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"), help="default: from the file extension")
+    parser.add_argument("--output-format", choices=("csv", "jsonl"), help="default: from the file extension")
+    parser.add_argument("--id-field", default="patient_id")
+    parser.add_argument("--symptoms-field", default="symptoms")
+    parser.add_argument("--chunk-size", type=positive_int, default=5000, help="records featurised and scored per call")
+    parser.add_argument("--jobs", type=int, default=-1, help="cores for the forest; -1 uses all of them")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    args = parser.parse_args()
+
+    predictor = load_batch_predictor(args.model_dir, n_jobs=args.jobs)
+    start = time.perf_counter()
+    total = unscored = failed = 0
+    with ExitStack() as files:
+        source = sys.stdin if args.input == "-" else files.enter_context(
+            open(args.input, newline="", encoding="utf-8"))
+        target = sys.stdout if args.output == "-" else files.enter_context(
+            open(args.output, "w", newline="", encoding="utf-8"))
+        writer_class = JsonlWriter if detect_format(args.output, args.output_format) == "jsonl" else CsvWriter
+        writer = writer_class(target, predictor.labels)
+        records = read_records(source, detect_format(args.input, args.input_format), args.id_field,
+                               args.symptoms_field)
+        while True:
+            chunk = list(islice(records, args.chunk_size))
+            if not chunk:
+                break
+            results = iter(predictor.predict([symptoms for _, symptoms, error in chunk if error is None]))
+            for record_id, _, error in chunk:
+                if error is not None:
+                    writer.write(record_id, None, None, [], error)
+                    failed += 1
+                    continue
+                result = next(results)
+                writer.write(record_id, *result)
+                unscored += result[0] is None
+            target.flush()
+            total += len(chunk)
+
+    elapsed = time.perf_counter() - start
+    print(f"Predicted {total - unscored - failed} of {total} records in {elapsed:.1f} s "
+          f"({unscored} had no known symptoms, {failed} could not be read)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
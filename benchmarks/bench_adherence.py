@@ -0,0 +1,68 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import ConnectionPool, migrate
+from dose_log import DoseLog
+
+
+def populate(log, args):
+    rng = random.Random(42)
+    start = date.today() - timedelta(days=args.days - 1)
+    for offset in range(args.days):
+        day = (start + timedelta(days=offset)).isoformat()
+        fired = [(patient_id, patient_id * args.doses + k, day, 480 + k * 240)
+                 for patient_id in range(1, args.patients + 1) for k in range(args.doses)]
+        log.record_many("fired", fired)
+        log.record_many("taken", [dose for dose in fired if rng.random() < 0.8])
+        log.record_many("missed", [dose for dose in fired if rng.random() < 0.1])
+    log.close()
+    return start.isoformat(), date.today().isoformat()
+
+
+def time_queries(label, fn, args, start_day, end_day):
+    rng = random.Random(7)
+    patient_ids = [rng.randint(1, args.patients) for _ in range(args.queries)]
+    start = time.perf_counter()
+    for patient_id in patient_ids:
+        fn(patient_id, start_day, end_day)
+    print(f"{label:<10} {(time.perf_counter() - start) * 1000 / args.queries:8.3f} ms/query")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time per-patient adherence over the dose_events rollups")
+    parser.add_argument("--patients", type=int, default=500)
+    parser.add_argument("--doses", type=int, default=3, help="doses per patient per day")
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = ConnectionPool(os.path.join(tmp, "bench.db"))
+        db.transaction(migrate)
+        log = DoseLog(db)
+
+        start = time.perf_counter()
+        start_day, end_day = populate(log, args)
+        events = db.query_one("SELECT COUNT(*) FROM dose_events")[0]
+        print(f"{events} events over {args.days} days written in {time.perf_counter() - start:.1f} s")
+
+        def raw_scan(patient_id, start_day, end_day):
+            return db.query_one(
+                "SELECT SUM(event = 'fired'), SUM(event = 'taken') FROM dose_events NOT INDEXED "
+                "WHERE patient_id = ? AND day BETWEEN ? AND ?", (patient_id, start_day, end_day)
+            )
+
+        time_queries("scan", raw_scan, args, start_day, end_day)
+        time_queries("rollup", log.adherence, args, start_day, end_day)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from ml_models import load_models
+
+
+def samples(disease_encoder, count):
+    rng = random.Random(42)
+    diseases = [str(disease) for disease in disease_encoder.classes_]
+    return [(rng.randint(1, 90), rng.randint(0, 1), rng.randint(0, 1), rng.choice(diseases)) for _ in range(count)]
+
+
+def time_calls(label, fn, inputs, warmup):
+    for args in inputs[:warmup]:
+        fn(*args)
+    timings = []
+    for args in inputs:
+        start = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    p50, p99 = np.percentile(timings, [50, 99])
+    print(f"{label:<28} p50 {p50:9.1f} us   p99 {p99:9.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-sample medicine category prediction latency")
+    parser.add_argument("--model-dir", default=os.path.join(ROOT, "medicine_model"))
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=50)
+    args = parser.parse_args()
+
+    models = load_models(args.model_dir)
+    sklearn_forest = joblib.load(os.path.join(args.model_dir, "medicine_predictor.pkl"))
+    inputs = samples(models.disease_encoder, args.calls)
+
+    def dataframe_path(age, is_diabetic, has_hypertension, disease):
+        # What add_medicine_info did per click before the inference module.
+        disease_encoded = models.disease_encoder.transform([disease])[0]
+        input_df = pd.DataFrame([{
+            "age": age,
+            "is_diabetic": is_diabetic,
+            "has_hypertension": has_hypertension,
+            "disease_encoded": disease_encoded
+        }])
+        pred_encoded = sklearn_forest.predict(input_df)[0]
+        return models.category_encoder.inverse_transform([pred_encoded])[0]
+
+    mismatches = sum(dataframe_path(*sample) != models.category_predictor.predict(*sample) for sample in inputs[:200])
+    print(f"{mismatches} of 200 predictions differ between the two paths")
+
+    time_calls("DataFrame + sklearn", dataframe_path, inputs, args.warmup)
+    time_calls("CategoryPredictor", models.category_predictor.predict, inputs, args.warmup)
+
+
+if __name__ == "__main__":
+    main()
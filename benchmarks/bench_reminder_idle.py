@@ -0,0 +1,76 @@
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reminder_index import ReminderIndex
+from reminder_scheduler import ReminderPoller, ReminderScheduler
+
+
+class FakePatient:
+    def __init__(self):
+        self.medicines = []
+
+
+class FakeMedicine:
+    def __init__(self, medicine_id, time_obj, patient):
+        self.medicine_id = medicine_id
+        self.time_obj = time_obj
+        self.patient = patient
+
+
+def build_index(n_medicines, hours_ahead):
+    due_at = (datetime.now() + timedelta(hours=hours_ahead)).time()
+    patient = FakePatient()
+    for medicine_id in range(1, n_medicines + 1):
+        patient.medicines.append(FakeMedicine(medicine_id, due_at, patient))
+    index = ReminderIndex()
+    index.rebuild([patient])
+    return index
+
+
+def measure(driver_cls, index, duration):
+    fired = []
+    driver = driver_cls(index, lambda now, minute: fired.append(minute))
+    thread = threading.Thread(target=driver.run, daemon=True)
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    thread.start()
+    time.sleep(duration)
+    driver.stop()
+    thread.join()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    return {
+        "name": driver_cls.__name__,
+        "cpu_ms": cpu * 1000,
+        "wall_s": wall,
+        "wakeups": driver.wakeups,
+        "fired": len(fired),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare idle CPU of the reminder poller and scheduler")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run each driver")
+    parser.add_argument("--medicines", type=int, default=10000, help="number of scheduled medicines")
+    parser.add_argument("--hours-ahead", type=float, default=3.0, help="how far away the next dose is")
+    args = parser.parse_args()
+
+    index = build_index(args.medicines, args.hours_ahead)
+    print(f"{args.medicines} medicines, next dose in {args.hours_ahead}h, {args.duration}s per driver")
+
+    for driver_cls in (ReminderPoller, ReminderScheduler):
+        result = measure(driver_cls, index, args.duration)
+        print(f"{result['name']:<18} cpu={result['cpu_ms']:8.2f} ms  "
+              f"wakeups={result['wakeups']:5d}  fired={result['fired']}  wall={result['wall_s']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import connect, migrate
+from patient_store import load_patients
+
+
+def populate(conn, n_medicines, per_patient):
+    rng = random.Random(42)
+    n_patients = max(1, n_medicines // per_patient)
+    conn.executemany(
+        "INSERT INTO patients (name, age, gender, medical_history, chronic_diseases) VALUES (?, ?, ?, ?, ?)",
+        [(f"Patient {i}", rng.randint(1, 95), rng.choice(["Male", "Female"]), "None", "Diabetes")
+         for i in range(n_patients)]
+    )
+    conn.executemany(
+        "INSERT INTO medicines (patient_id, name, dosage, time_str, disease, is_diabetic, category, meal_timing) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(i % n_patients + 1, f"Medicine {i}", "10 MG",
+          f"{rng.randint(1, 12):02d}:{rng.choice(range(0, 60, 5)):02d} {rng.choice(['AM', 'PM'])}",
+          "Flu", rng.random() < 0.2, "Oral", "After meal")
+         for i in range(n_medicines)]
+    )
+    conn.commit()
+    return n_patients
+
+
+def open_baseline(path):
+    # Current tables but none of the secondary indexes, and default pragmas.
+    conn = sqlite3.connect(path)
+    migrate(conn)
+    for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'").fetchall():
+        conn.execute(f"DROP INDEX {name}")
+    conn.commit()
+    return conn
+
+
+def open_tuned(path):
+    conn = connect(path)
+    migrate(conn)
+    return conn
+
+
+def run(label, opener, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        conn = opener(path)
+        n_patients = populate(conn, args.medicines, args.per_patient)
+
+        start = time.perf_counter()
+        load_patients(conn)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        rng = random.Random(7)
+        start = time.perf_counter()
+        for i in range(args.ops):
+            conn.execute(
+                "INSERT INTO medicines (patient_id, name, dosage, time_str, disease, is_diabetic, category, meal_timing) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (rng.randint(1, n_patients), f"Extra {i}", "5 MG", "8:00 AM", "Flu", False, "Oral", "After meal")
+            )
+            conn.commit()
+        insert_ms = (time.perf_counter() - start) * 1000 / args.ops
+
+        start = time.perf_counter()
+        for patient_id in rng.sample(range(1, n_patients + 1), args.ops):
+            conn.execute("DELETE FROM medicines WHERE patient_id = ?", (patient_id,))
+            conn.execute("DELETE FROM patient_conditions WHERE patient_id = ?", (patient_id,))
+            conn.execute("DELETE FROM patients WHERE patient_id = ?", (patient_id,))
+            conn.commit()
+        delete_ms = (time.perf_counter() - start) * 1000 / args.ops
+
+        conn.close()
+
+    print(f"{label:<10} load={load_ms:9.1f} ms  insert={insert_ms:7.3f} ms/op  delete={delete_ms:7.3f} ms/op")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare SQLite latency before and after the schema/pragma profile")
+    parser.add_argument("--medicines", type=int, default=100000)
+    parser.add_argument("--per-patient", type=int, default=3)
+    parser.add_argument("--ops", type=int, default=200, help="single-row inserts and patient deletes to time")
+    args = parser.parse_args()
+
+    print(f"{args.medicines} medicines, {args.per_patient} per patient, {args.ops} ops")
+    run("before", open_baseline, args)
+    run("after", open_tuned, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# What main.py imported at module level before the ML stack was deferred.
+EAGER_IMPORTS = "import main, joblib, pandas, sklearn.ensemble, sklearn.preprocessing"
+
+
+def time_import(statement, runs):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=ROOT, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time app import and ML model loading")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement; the best is kept")
+    parser.add_argument("--model-dir", default=os.path.join(ROOT, "medicine_model"))
+    args = parser.parse_args()
+
+    baseline = time_import("pass", args.runs)
+    deferred = time_import("import main", args.runs)
+    eager = time_import(EAGER_IMPORTS, args.runs)
+    print(f"interpreter only      {baseline:8.1f} ms")
+    print(f"import main (now)     {deferred:8.1f} ms")
+    print(f"import main + ML      {eager:8.1f} ms  (before: all paid before the window appeared)")
+
+    if not os.path.isdir(args.model_dir):
+        print(f"{args.model_dir} not found; run train_models.py to time model loading")
+        return
+
+    from ml_models import load_models
+    models = load_models(args.model_dir)
+    print(f"load_models           {models.load_ms:8.1f} ms  (now on a worker thread after the window is up)")
+
+
+if __name__ == "__main__":
+    main()
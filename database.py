@@ -0,0 +1,287 @@
+import queue
+import sqlite3
+import threading
+import weakref
+from concurrent.futures import Future
+
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA busy_timeout = 5000",
+)
+
+
+def fts5_tokenizer(conn):
+    # trigram gives substring matching but needs SQLite 3.34+; older builds
+    # fall back to word prefixes.
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x, tokenize = 'trigram')")
+        conn.execute("DROP TABLE temp.fts5_probe")
+        return "trigram"
+    except sqlite3.OperationalError:
+        return "unicode61"
+
+
+def patient_search_migration(conn):
+    tokenize = "'trigram'" if fts5_tokenizer(conn) == "trigram" else "'unicode61', prefix = '1 2 3'"
+    return f'''
+    CREATE VIRTUAL TABLE IF NOT EXISTS patient_search USING fts5(
+        name, patient_ref, conditions, tokenize = {tokenize}
+    );
+    INSERT INTO patient_search (rowid, name, patient_ref, conditions)
+    SELECT p.patient_id, p.name, CAST(p.patient_id AS TEXT),
+           COALESCE((SELECT group_concat(condition, ', ') FROM (
+               SELECT condition FROM patient_conditions c WHERE c.patient_id = p.patient_id ORDER BY position)), '')
+    FROM patients p;
+
+    CREATE TRIGGER IF NOT EXISTS patient_search_insert AFTER INSERT ON patients BEGIN
+        INSERT INTO patient_search (rowid, name, patient_ref, conditions)
+        VALUES (new.patient_id, new.name, CAST(new.patient_id AS TEXT), '');
+    END;
+    CREATE TRIGGER IF NOT EXISTS patient_search_rename AFTER UPDATE OF name ON patients BEGIN
+        UPDATE patient_search SET name = new.name WHERE rowid = new.patient_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS patient_search_delete AFTER DELETE ON patients BEGIN
+        DELETE FROM patient_search WHERE rowid = old.patient_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS patient_search_condition_added AFTER INSERT ON patient_conditions BEGIN
+        UPDATE patient_search SET conditions = COALESCE((SELECT group_concat(condition, ', ') FROM (
+            SELECT condition FROM patient_conditions WHERE patient_id = new.patient_id ORDER BY position)), '')
+        WHERE rowid = new.patient_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS patient_search_condition_removed AFTER DELETE ON patient_conditions BEGIN
+        UPDATE patient_search SET conditions = COALESCE((SELECT group_concat(condition, ', ') FROM (
+            SELECT condition FROM patient_conditions WHERE patient_id = old.patient_id ORDER BY position)), '')
+        WHERE rowid = old.patient_id;
+    END;
+    '''
+
+
+# Each entry upgrades the schema by one version; PRAGMA user_version records
+# how many have been applied. Append new steps, never edit old ones. A step
+# may be a function of the connection that returns its script.
+MIGRATIONS = (
+    '''
+    CREATE TABLE IF NOT EXISTS users (
+        user_id TEXT PRIMARY KEY,
+        username TEXT UNIQUE,
+        password_hash TEXT,
+        role TEXT,
+        approved BOOLEAN
+    );
+    CREATE TABLE IF NOT EXISTS patients (
+        patient_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT,
+        age INTEGER,
+        gender TEXT,
+        medical_history TEXT,
+        chronic_diseases TEXT
+    );
+    CREATE TABLE IF NOT EXISTS medicines (
+        medicine_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        patient_id INTEGER,
+        name TEXT,
+        dosage TEXT,
+        time_str TEXT,
+        disease TEXT,
+        is_diabetic BOOLEAN,
+        category TEXT,
+        meal_timing TEXT,
+        FOREIGN KEY (patient_id) REFERENCES patients (patient_id)
+    );
+    CREATE TABLE IF NOT EXISTS reminder_log (
+        medicine_id INTEGER,
+        day TEXT,
+        minute INTEGER,
+        fired BOOLEAN,
+        PRIMARY KEY (medicine_id, day, minute)
+    );
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_medicines_patient_id ON medicines (patient_id);
+    CREATE INDEX IF NOT EXISTS idx_reminder_log_day ON reminder_log (day);
+    ANALYZE;
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS patient_conditions (
+        patient_id INTEGER,
+        position INTEGER,
+        condition TEXT,
+        PRIMARY KEY (patient_id, position),
+        FOREIGN KEY (patient_id) REFERENCES patients (patient_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_patient_conditions_condition ON patient_conditions (condition);
+    WITH RECURSIVE split (patient_id, position, condition, rest) AS (
+        SELECT patient_id, -1, NULL, chronic_diseases || ','
+        FROM patients WHERE chronic_diseases IS NOT NULL AND chronic_diseases != ''
+        UNION ALL
+        SELECT patient_id, position + 1, substr(rest, 1, instr(rest, ',') - 1), substr(rest, instr(rest, ',') + 1)
+        FROM split WHERE rest != ''
+    )
+    INSERT OR REPLACE INTO patient_conditions (patient_id, position, condition)
+    SELECT patient_id, position, condition FROM split WHERE position >= 0;
+
+    ALTER TABLE medicines ADD COLUMN minute_of_day INTEGER;
+    UPDATE medicines SET minute_of_day =
+        (CAST(substr(time_str, 1, instr(time_str, ':') - 1) AS INTEGER) % 12
+         + CASE
+               WHEN time_str LIKE '% PM' THEN 12
+               WHEN time_str LIKE '% AM' THEN 0
+               ELSE CAST(substr(time_str, 1, instr(time_str, ':') - 1) AS INTEGER) / 12 * 12
+           END) * 60
+        + CAST(substr(time_str, instr(time_str, ':') + 1, 2) AS INTEGER)
+    WHERE time_str LIKE '%:%';
+    UPDATE medicines SET time_str = printf('%d:%02d %s',
+        CASE WHEN minute_of_day / 60 % 12 = 0 THEN 12 ELSE minute_of_day / 60 % 12 END,
+        minute_of_day % 60,
+        CASE WHEN minute_of_day < 720 THEN 'AM' ELSE 'PM' END)
+    WHERE time_str NOT LIKE '% %' AND minute_of_day IS NOT NULL;
+    CREATE INDEX IF NOT EXISTS idx_medicines_minute_of_day ON medicines (minute_of_day);
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS dose_events (
+        event_id INTEGER PRIMARY KEY,
+        patient_id INTEGER,
+        medicine_id INTEGER,
+        day TEXT,
+        minute INTEGER,
+        event TEXT,
+        recorded_at TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_dose_events_patient_day ON dose_events (patient_id, day, event);
+    CREATE INDEX IF NOT EXISTS idx_dose_events_medicine_day ON dose_events (medicine_id, day, event);
+    CREATE TABLE IF NOT EXISTS dose_daily (
+        patient_id INTEGER,
+        day TEXT,
+        fired INTEGER NOT NULL DEFAULT 0,
+        taken INTEGER NOT NULL DEFAULT 0,
+        missed INTEGER NOT NULL DEFAULT 0,
+        snoozed INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (patient_id, day)
+    ) WITHOUT ROWID;
+    ''',
+    patient_search_migration,
+)
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def configure_connection(conn):
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def connect(db_path, **kwargs):
+    return configure_connection(sqlite3.connect(db_path, **kwargs))
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    version = schema_version(conn)
+    for target, step in enumerate(MIGRATIONS[version:], start=version + 1):
+        script = step(conn) if callable(step) else step
+        try:
+            conn.executescript(f"BEGIN; {script} PRAGMA user_version = {target}; COMMIT;")
+        except Exception:
+            conn.rollback()
+            raise
+    return schema_version(conn)
+
+
+class _ThreadReader:
+    def __init__(self, conn):
+        self.conn = conn
+
+
+class ConnectionPool:
+    # Every thread reads through its own connection, so with WAL a slow
+    # query on a worker never blocks the Tk thread. All writes are queued to
+    # one writer thread and run there inside a transaction.
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._readers = []
+        self._closed = False
+        self._writes = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="db-writer", daemon=True)
+        self._writer.start()
+
+    def reader(self):
+        holder = getattr(self._local, "reader", None)
+        if holder is None:
+            conn = connect(self.db_path, check_same_thread=False)
+            holder = self._local.reader = _ThreadReader(conn)
+            # The thread's locals are dropped when it exits, which closes its
+            # connection then rather than at shutdown.
+            weakref.finalize(holder, self._release, conn)
+            with self._lock:
+                self._readers.append(conn)
+        return holder.conn
+
+    def query(self, sql, params=()):
+        return self.reader().execute(sql, params).fetchall()
+
+    def query_one(self, sql, params=()):
+        return self.reader().execute(sql, params).fetchone()
+
+    def submit(self, fn, *args):
+        future = Future()
+        if self._closed:
+            future.set_exception(RuntimeError("Connection pool is closed"))
+        else:
+            self._writes.put((future, fn, args))
+        return future
+
+    def transaction(self, fn, *args):
+        if threading.current_thread() is self._writer:
+            return fn(self._writer_conn, *args)
+        return self.submit(fn, *args).result()
+
+    def execute(self, sql, params=()):
+        return self.transaction(lambda conn: conn.execute(sql, params).lastrowid)
+
+    def executemany(self, sql, rows):
+        return self.transaction(lambda conn: conn.executemany(sql, rows).rowcount)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._writes.put(None)
+        self._writer.join()
+        with self._lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers = []
+
+    def _release(self, conn):
+        with self._lock:
+            if conn in self._readers:
+                self._readers.remove(conn)
+        conn.close()
+
+    def _write_loop(self):
+        self._writer_conn = connect(self.db_path)
+        while True:
+            item = self._writes.get()
+            if item is None:
+                break
+            future, fn, args = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                with self._writer_conn:
+                    result = fn(self._writer_conn, *args)
+                future.set_result(result)
+            except BaseException as e:
+                future.set_exception(e)
+        self._writer_conn.close()
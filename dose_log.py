@@ -0,0 +1,114 @@
+import threading
+from collections import Counter
+from concurrent.futures import Future, wait
+from datetime import datetime
+
+DOSE_EVENTS = ("fired", "taken", "missed", "snoozed")
+
+
+class DoseLog:
+    # Append-only record of what happened to each dose. Events are buffered
+    # and written in batches on the pool's writer thread, and every batch
+    # also bumps the per-patient daily counters in dose_daily, so adherence
+    # reports read a handful of rollup rows instead of scanning events.
+
+    def __init__(self, db, batch_size=200, flush_interval=2.0):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending = []
+        self._timer = None
+        self._last_write = None
+
+    def record(self, event, patient_id, medicine_id, day, minute):
+        self.record_many(event, [(patient_id, medicine_id, day, minute)])
+
+    def record_many(self, event, doses):
+        if event not in DOSE_EVENTS:
+            raise ValueError(f"Unknown dose event: {event}")
+        recorded_at = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            self._pending.extend((patient_id, medicine_id, day, minute, event, recorded_at)
+                                 for patient_id, medicine_id, day, minute in doses)
+            if len(self._pending) < self.batch_size:
+                if self._timer is None:
+                    self._timer = threading.Timer(self.flush_interval, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            rows, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            # The writer runs jobs in order, so once the latest batch is done
+            # every earlier one is too.
+            if rows:
+                self._last_write = self.db.submit(self._write, rows)
+            elif self._last_write is None:
+                self._last_write = Future()
+                self._last_write.set_result(0)
+            return self._last_write
+
+    def close(self):
+        self.flush().result()
+
+    def daily(self, patient_id, start_day, end_day):
+        self._settle()
+        return self.db.query(
+            "SELECT day, fired, taken, missed, snoozed FROM dose_daily "
+            "WHERE patient_id = ? AND day BETWEEN ? AND ? ORDER BY day",
+            (patient_id, start_day, end_day)
+        )
+
+    def adherence(self, patient_id, start_day, end_day):
+        self._settle()
+        row = self.db.query_one(
+            "SELECT COALESCE(SUM(fired), 0), COALESCE(SUM(taken), 0), COALESCE(SUM(missed), 0), "
+            "COALESCE(SUM(snoozed), 0) FROM dose_daily WHERE patient_id = ? AND day BETWEEN ? AND ?",
+            (patient_id, start_day, end_day)
+        )
+        return self._summary(row)
+
+    def medicine_adherence(self, medicine_id, start_day, end_day):
+        # Answered from idx_dose_events_medicine_day alone, without touching
+        # the table rows.
+        self._settle()
+        row = self.db.query_one(
+            "SELECT COALESCE(SUM(event = 'fired'), 0), COALESCE(SUM(event = 'taken'), 0), "
+            "COALESCE(SUM(event = 'missed'), 0), COALESCE(SUM(event = 'snoozed'), 0) "
+            "FROM dose_events WHERE medicine_id = ? AND day BETWEEN ? AND ?",
+            (medicine_id, start_day, end_day)
+        )
+        return self._summary(row)
+
+    def _settle(self):
+        # Reads should see everything recorded so far, but a failed batch is
+        # reported by close(), not by every report opened afterwards.
+        wait([self.flush()])
+
+    def _summary(self, row):
+        summary = dict(zip(DOSE_EVENTS, row))
+        summary["rate"] = summary["taken"] / summary["fired"] if summary["fired"] else None
+        return summary
+
+    def _write(self, conn, rows):
+        conn.executemany(
+            "INSERT INTO dose_events (patient_id, medicine_id, day, minute, event, recorded_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        counts = Counter((row[0], row[2], row[4]) for row in rows)
+        days = dict.fromkeys((patient_id, day) for patient_id, day, _ in counts)
+        conn.executemany(
+            "INSERT INTO dose_daily (patient_id, day, fired, taken, missed, snoozed) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (patient_id, day) DO UPDATE SET fired = fired + excluded.fired, "
+            "taken = taken + excluded.taken, missed = missed + excluded.missed, snoozed = snoozed + excluded.snoozed",
+            [(patient_id, day) + tuple(counts[patient_id, day, event] for event in DOSE_EVENTS)
+             for patient_id, day in days]
+        )
+        return len(rows)
@@ -0,0 +1,126 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Column order medicine_predictor was trained on; used when the pickle
+# predates scikit-learn recording feature_names_in_.
+CATEGORY_FEATURES = ("age", "is_diabetic", "has_hypertension", "disease_encoded")
+
+
+@lru_cache(maxsize=2048)
+def normalize_symptom(text):
+    # "Sore Throat" and "shortness-of-breath" name the vocabulary's
+    # sore_throat and shortness_of_breath.
+    return "_".join(text.lower().replace("-", " ").split())
+
+
+class SymptomFeaturizer:
+    # Turns comma-separated symptoms into the single bag-of-symptoms row the
+    # disease forest was trained on, looking each normalised symptom up in
+    # the fitted vectorizer's vocabulary instead of running its tokenizer.
+
+    def __init__(self, vectorizer):
+        self.columns = {str(token): int(column) for token, column in vectorizer.vocabulary_.items()}
+        self.width = len(self.columns)
+
+    def split(self, text):
+        known, unknown = [], []
+        for part in text.split(","):
+            token = normalize_symptom(part)
+            if token in self.columns:
+                known.append(self.columns[token])
+            elif token:
+                unknown.append(part.strip())
+        return known, unknown
+
+    def transform_many(self, texts):
+        # Returns the rows and, per text, the symptoms it did not recognise;
+        # a row of zeros means none were.
+        rows, columns, unknown = [], [], []
+        for i, text in enumerate(texts):
+            known, missing = self.split(text)
+            rows.extend([i] * len(known))
+            columns.extend(known)
+            unknown.append(missing)
+        matrix = np.zeros((len(unknown), self.width), dtype=np.float32)
+        matrix[rows, columns] = 1
+        return matrix, unknown
+
+    def transform(self, text):
+        known, unknown = self.split(text)
+        if not known:
+            raise ValueError(f"No known symptoms in: {', '.join(unknown) or text}")
+        row = np.zeros(self.width, dtype=np.float32)
+        row[known] = 1
+        return row
+
+
+class DiseasePredictor:
+    def __init__(self, forest, vectorizer):
+        self.forest = forest
+        self.featurizer = SymptomFeaturizer(vectorizer)
+        self.labels = [str(label) for label in forest.classes_]
+
+    def predict_proba(self, symptoms):
+        return self.forest.predict_proba_one(self.featurizer.transform(symptoms))
+
+    def predict(self, symptoms):
+        return self.labels[int(self.predict_proba(symptoms).argmax())]
+
+
+class BatchDiseasePredictor:
+    # Bulk triage runs on the pickled scikit-learn forest rather than the
+    # mapped arrays: for thousands of rows its compiled traversal is several
+    # times faster than walking the arrays level by level in NumPy, and
+    # n_jobs spreads the trees over every core.
+
+    def __init__(self, forest, featurizer, n_jobs=-1):
+        self.forest = forest
+        self.forest.n_jobs = n_jobs
+        self.featurizer = featurizer
+        self.labels = [str(label) for label in forest.classes_]
+
+    def predict(self, texts):
+        # One (disease, probabilities, unknown symptoms) per text; disease
+        # and probabilities are None when no symptom was recognised.
+        matrix, unknown = self.featurizer.transform_many(texts)
+        scored = np.flatnonzero(matrix.any(axis=1))
+        results = [(None, None, missing) for missing in unknown]
+        if len(scored):
+            probabilities = self.forest.predict_proba(matrix[scored])
+            for i, proba in zip(scored, probabilities):
+                results[i] = (self.labels[int(proba.argmax())], proba, unknown[i])
+        return results
+
+
+class CategoryPredictor:
+    # Suggests a medicine category for one patient and disease straight from
+    # the forest arrays. Column positions, disease codes and category labels
+    # are resolved once here, so a call builds one small float32 row instead
+    # of a DataFrame and skips scikit-learn's input validation and
+    # LabelEncoder lookups.
+
+    def __init__(self, forest, disease_encoder, category_encoder):
+        self.forest = forest
+        names = forest.feature_names or CATEGORY_FEATURES
+        self.columns = {name: i for i, name in enumerate(names)}
+        self.disease_codes = {str(disease).lower(): code for code, disease in enumerate(disease_encoder.classes_)}
+        self.labels = [str(label) for label in category_encoder.classes_[forest.classes_.astype(int)]]
+
+    def predict_proba(self, age, is_diabetic, has_hypertension, disease):
+        code = self.disease_codes.get(disease.strip().lower())
+        if code is None:
+            return None
+
+        row = np.empty(len(self.columns), dtype=np.float32)
+        row[self.columns["age"]] = age
+        row[self.columns["is_diabetic"]] = is_diabetic
+        row[self.columns["has_hypertension"]] = has_hypertension
+        row[self.columns["disease_encoded"]] = code
+        return self.forest.predict_proba_one(row)
+
+    def predict(self, age, is_diabetic, has_hypertension, disease):
+        proba = self.predict_proba(age, is_diabetic, has_hypertension, disease)
+        if proba is None:
+            return None
+        return self.labels[int(proba.argmax())]
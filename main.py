@@ -1,35 +1,43 @@
 import tkinter as tk
 from tkinter import messagebox, simpledialog, ttk
 from datetime import datetime, timedelta
+import os
 import threading
-import joblib
 import time
-import winsound
-import sqlite3
 import hashlib
 import uuid
-import pandas as pd
 
-try:
-    import pandas as pd
-    import joblib
-    from sklearn.preprocessing import LabelEncoder  # Needed for encoders
-    HAS_ML_LIBRARIES = True
-except ImportError as e:
-    print(f"⚠️ ML dependencies missing: {e}")
-    print("Please install required ML libraries: pip install scikit-learn pandas joblib")
-    HAS_ML_LIBRARIES = False
-    pd = None
-    joblib = None
-    LabelEncoder = None
+from activity_log import ActivityLog
+from alerts import AlertQueue
+from database import ConnectionPool, migrate
+from dose_log import DoseLog
+from medicine_stats import TIME_BANDS, MedicineStats
+from ml_models import load_models
+from models import User, Patient, Medicine
+from patient_search import PatientSearch
+from patient_store import LazyPatientList, PatientPages, PatientRegistry, PatientWriter, load_patients
+from reminder_index import MINUTES_PER_DAY, ReminderIndex
+from reminder_dedup import ReminderLog
+from reminder_scheduler import ReminderPoller, ReminderScheduler
+from tasks import TaskRunner
+from virtual_list import ListSource, VirtualTreeview
 
-class User:
-    def __init__(self, username, password_hash, role="user", approved=False, user_id=None):
-        self.username = username
-        self.password_hash = password_hash
-        self.role = role
-        self.approved = approved
-        self.user_id = user_id if user_id else str(uuid.uuid4())
+DB_PATH = 'medicine_reminder.db'
+ACTIVITY_LOG_PATH = 'activity.log'
+# The activity pump polls quickly while messages keep arriving and drops to
+# a slow tick once a drain comes back empty.
+ACTIVITY_PUMP_MS = 50
+ACTIVITY_IDLE_MS = 1000
+
+# "scheduler" sleeps until the next due dose; "poll" wakes every second.
+REMINDER_MODE = "scheduler"
+
+# Page patients in from SQLite on demand instead of loading them all at startup.
+LAZY_LOADING = False
+SNOOZE_MINUTES = 10
+SEARCH_DEBOUNCE_MS = 250
+SCHEDULE_WINDOWS = {"All day": None, "Next 2 hours": 2, "Next 6 hours": 6, "Next 12 hours": 12}
+ADHERENCE_DAYS = 30
 
 class LoginApp:
     def __init__(self, root):
@@ -39,58 +47,21 @@ class LoginApp:
         self.root.configure(bg="#f0f0f0")
         
         self.current_user = None
-        self.conn = sqlite3.connect('medicine_reminder.db')
+        self.db = ConnectionPool(DB_PATH)
         self.create_tables()
         self.setup_default_superadmin()
         self.setup_ui()
     
     def create_tables(self):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                user_id TEXT PRIMARY KEY,
-                username TEXT UNIQUE,
-                password_hash TEXT,
-                role TEXT,
-                approved BOOLEAN
-            )
-        ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS patients (
-                patient_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT,
-                age INTEGER,
-                gender TEXT,
-                medical_history TEXT,
-                chronic_diseases TEXT
-            )
-        ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS medicines (
-                medicine_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                patient_id INTEGER,
-                name TEXT,
-                dosage TEXT,
-                time_str TEXT,
-                disease TEXT,
-                is_diabetic BOOLEAN,
-                category TEXT,
-                meal_timing TEXT,
-                FOREIGN KEY (patient_id) REFERENCES patients (patient_id)
-            )
-        ''')
-        self.conn.commit()
+        self.db.transaction(migrate)
 
     def setup_default_superadmin(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'superadmin'")
-        if cursor.fetchone()[0] == 0:
+        if self.db.query_one("SELECT COUNT(*) FROM users WHERE role = 'superadmin'")[0] == 0:
             default_hash = hashlib.sha256("your_secure_password_2025".encode()).hexdigest()
-            cursor.execute('''
+            self.db.execute('''
                 INSERT INTO users (user_id, username, password_hash, role, approved)
                 VALUES (?, ?, ?, ?, ?)
             ''', (str(uuid.uuid4()), "Saifi", default_hash, "superadmin", True))
-            self.conn.commit()
 
     def setup_ui(self):
         main_frame = tk.Frame(self.root, bg="#f0f0f0", padx=20, pady=20)
@@ -157,9 +128,7 @@ class LoginApp:
                 messagebox.showerror("Error", "Please enter both username and password")
                 return
                 
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT password_hash FROM users WHERE username = ?", (username,))
-            user = cursor.fetchone()
+            user = self.db.query_one("SELECT password_hash FROM users WHERE username = ?", (username,))
             
             if not user:
                 messagebox.showerror("Error", "User not found")
@@ -213,20 +182,17 @@ class LoginApp:
                 messagebox.showerror("Error", "Passwords do not match")
                 return
                 
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT username FROM users WHERE username = ?", (username,))
-            if cursor.fetchone():
+            if self.db.query_one("SELECT username FROM users WHERE username = ?", (username,)):
                 messagebox.showerror("Error", "Username already exists")
                 return
                 
             password_hash = hashlib.sha256(password.encode()).hexdigest()
             approved_status = True if self.current_user and self.current_user.role in ["admin", "superadmin"] else False
             
-            cursor.execute('''
+            self.db.execute('''
                 INSERT INTO users (user_id, username, password_hash, role, approved)
                 VALUES (?, ?, ?, ?, ?)
             ''', (str(uuid.uuid4()), username, password_hash, "user", approved_status))
-            self.conn.commit()
             
             messagebox.showinfo("Success", "Account created successfully!")
             signup_window.destroy()
@@ -243,9 +209,7 @@ class LoginApp:
             
         password_hash = hashlib.sha256(password.encode()).hexdigest()
         
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT user_id, username, password_hash, role, approved FROM users WHERE username = ?", (username,))
-        user_data = cursor.fetchone()
+        user_data = self.db.query_one("SELECT user_id, username, password_hash, role, approved FROM users WHERE username = ?", (username,))
         
         if not user_data or user_data[2] != password_hash:
             messagebox.showerror("Error", "Invalid username or password")
@@ -262,72 +226,61 @@ class LoginApp:
     
     def launch_main_app(self):
         root = tk.Tk()
-        app = MedicineReminderApp(root, self.current_user, self.conn)
+        app = MedicineReminderApp(root, self.current_user, self.db)
         root.mainloop()
     
     def __del__(self):
-        if hasattr(self, 'conn'):
-            self.conn.close()
-
-class Patient:
-    def __init__(self, name, age, gender, medical_history, chronic_diseases, patient_id=None):
-        self.name = name
-        self.age = age
-        self.gender = gender
-        self.medical_history = medical_history
-        self.chronic_diseases = chronic_diseases
-        self.patient_id = patient_id
-        self.medicines = []
-
-class Medicine:
-    def __init__(self, name, dosage, time_str, disease, is_diabetic, patient, category, meal_timing, medicine_id=None):
-        self.name = name
-        self.dosage = dosage
-        self.time_str = time_str
-        self.disease = disease
-        self.is_diabetic = is_diabetic
-        self.patient = patient
-        self.category = category
-        self.meal_timing = meal_timing
-        self.medicine_id = medicine_id
-        self.time_obj = datetime.strptime(time_str, "%I:%M %p").time()
+        if hasattr(self, 'db'):
+            self.db.close()
 
 class MedicineReminderApp:
-    def __init__(self, root, current_user, conn):
+    def __init__(self, root, current_user, db):
         self.root = root
         self.root.title("Smart Medicine Reminder Pro")
         self.root.geometry("900x700")
         self.root.configure(bg="#f0f0f0")
         
         self.current_user = current_user
-        self.conn = conn
+        self.db = db
         self.patients = []
-        self.reminder_history = []
+        self.reminder_log = ReminderLog(self.db)
+        self.dose_log = DoseLog(self.db)
+        self.reminder_index = ReminderIndex()
+        self.patient_writer = PatientWriter(self.db)
+        self.patient_search = PatientSearch(self.db)
+        self.activity = ActivityLog(ACTIVITY_LOG_PATH)
+        self.activity_pump = None
+        self.activity_idle = True
+        self.stats = MedicineStats()
         self.current_patient = None
         self.load_data()
         
-        try:
-            self.ml_model = joblib.load("medicine_model/medicine_predictor.pkl")
-            self.disease_encoder = joblib.load("medicine_model/disease_encoder.pkl")
-            self.category_encoder = joblib.load("medicine_model/category_encoder.pkl")
-            self.disease_predictor = joblib.load("medicine_model/disease_predictor.pkl")
-            self.symptom_encoder = joblib.load("medicine_model/symptom_encoder.pkl")
-            print("✅ ML models loaded successfully.")
-        except Exception as e:
-            print(f"⚠️ ML Model loading failed: {e}")
-            self.ml_model = None
-            self.disease_encoder = None
-            self.category_encoder = None
-            self.disease_predictor = None
-            self.symptom_encoder = None
-            messagebox.showwarning("Warning", "ML models could not be loaded. Disease prediction features will be disabled.")
+        self.ml_model = None
+        self.disease_encoder = None
+        self.category_encoder = None
+        self.disease_predictor = None
+        self.symptom_encoder = None
+        self.symptom_predictor = None
+        self.category_predictor = None
+        self.models_state = "loading"
+        self._model_buttons = []
 
         self.setup_ui()
+        self.tasks = TaskRunner(self.root, on_busy_change=self._show_busy)
+        self.tasks.run("load_models", load_models, on_done=self._on_models_loaded, on_error=self._on_models_failed,
+                       quiet=True)
+        self.alerts = AlertQueue(self._deliver_alerts)
+        self.reminder_window = None
         
         self.stop_thread = False
+        if REMINDER_MODE == "poll":
+            self.reminder_driver = ReminderPoller(self.reminder_index, self.fire_due_reminders)
+        else:
+            self.reminder_driver = ReminderScheduler(self.reminder_index, self.fire_due_reminders)
         self.reminder_thread = threading.Thread(target=self.check_reminders)
         self.reminder_thread.daemon = True
         self.reminder_thread.start()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
     def setup_ui(self):
         style = ttk.Style()
@@ -384,7 +337,9 @@ class MedicineReminderApp:
         other_btn_frame.pack(side=tk.LEFT, fill=tk.Y, padx=5)
         
         ttk.Button(other_btn_frame, text="Dashboard", command=self.show_dashboard).pack(fill=tk.X, pady=2)
-        ttk.Button(other_btn_frame, text="Predict Disease", command=self.predict_disease_from_symptoms).pack(fill=tk.X, pady=2)
+        predict_btn = ttk.Button(other_btn_frame, text="Predict Disease", command=self.predict_disease_from_symptoms)
+        predict_btn.pack(fill=tk.X, pady=2)
+        self._register_model_button(predict_btn)
         
         if self.current_user.role in ["admin", "superadmin"]:
             admin_btn_frame = ttk.LabelFrame(button_frame, text="Admin Tools", padding=10)
@@ -403,9 +358,16 @@ class MedicineReminderApp:
         self.status_label = ttk.Label(status_frame, text="Reminder system is active", foreground="green")
         self.status_label.pack(side=tk.LEFT)
         
+        self.busy_label = ttk.Label(status_frame, text="")
+        self.busy_label.pack(side=tk.LEFT, padx=10)
+        self.busy_bar = ttk.Progressbar(status_frame, mode="indeterminate", length=80)
+        
         self.dark_mode = tk.BooleanVar(value=False)
         ttk.Checkbutton(status_frame, text="Dark Mode", variable=self.dark_mode, command=self.toggle_dark_mode).pack(side=tk.RIGHT)
         
+        self.models_label = ttk.Label(status_frame, text="ML models: loading...", foreground="gray")
+        self.models_label.pack(side=tk.RIGHT, padx=10)
+        
         activity_frame = ttk.LabelFrame(main_frame, text="Recent Activity", padding=10)
         activity_frame.pack(fill=tk.BOTH, expand=True)
         
@@ -418,93 +380,108 @@ class MedicineReminderApp:
         
         self.add_activity("Application started")
         self.add_activity(f"Logged in as {self.current_user.role}")
+        self._pump_activity()
 
     def load_data(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM patients")
-        for row in cursor.fetchall():
-            patient = Patient(
-                name=row[1],
-                age=row[2],
-                gender=row[3],
-                medical_history=row[4],
-                chronic_diseases=row[5].split(',') if row[5] else [],
-                patient_id=row[0]
-            )
-            
-            cursor.execute("SELECT * FROM medicines WHERE patient_id = ?", (patient.patient_id,))
-            for med_row in cursor.fetchall():
-                try:
-                    time_str = med_row[4]
-                    if ' ' not in time_str:
-                        hour, minute = map(int, time_str.split(':'))
-                        am_pm = "AM" if hour < 12 else "PM"
-                        if hour > 12:
-                            hour -= 12
-                        elif hour == 0:
-                            hour = 12
-                        time_str = f"{hour}:{minute:02d} {am_pm}"
-                    
-                    medicine = Medicine(
-                        name=med_row[2],
-                        dosage=med_row[3],
-                        time_str=time_str,
-                        disease=med_row[5],
-                        is_diabetic=bool(med_row[6]),
-                        patient=patient,
-                        category=med_row[7],
-                        meal_timing=med_row[8],
-                        medicine_id=med_row[0]
-                    )
-                    patient.medicines.append(medicine)
-                except Exception as e:
-                    print(f"Error loading medicine {med_row[2]}: {e}")
-            
-            self.patients.append(patient)
-
-    def save_patient(self, patient):
-        cursor = self.conn.cursor()
-        if patient.patient_id:
-            cursor.execute('''
-                UPDATE patients SET name = ?, age = ?, gender = ?, medical_history = ?, chronic_diseases = ?
-                WHERE patient_id = ?
-            ''', (patient.name, patient.age, patient.gender, patient.medical_history,
-                  ','.join(patient.chronic_diseases), patient.patient_id))
-        else:
-            cursor.execute('''
-                INSERT INTO patients (name, age, gender, medical_history, chronic_diseases)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (patient.name, patient.age, patient.gender, patient.medical_history,
-                  ','.join(patient.chronic_diseases)))
-            patient.patient_id = cursor.lastrowid
+        self.stats.load(self.db.reader())
+        if LAZY_LOADING:
+            start = time.perf_counter()
+            self.patients = LazyPatientList(self.db)
+            self.reminder_index.rebuild_from(self.patients.dose_refs())
+            print(f"Indexed {len(self.reminder_index)} doses lazily in {(time.perf_counter() - start) * 1000:.1f} ms")
+            return
         
-        for medicine in patient.medicines:
-            if medicine.medicine_id:
-                cursor.execute('''
-                    UPDATE medicines SET name = ?, dosage = ?, time_str = ?, disease = ?, 
-                    is_diabetic = ?, category = ?, meal_timing = ?
-                    WHERE medicine_id = ?
-                ''', (medicine.name, medicine.dosage, medicine.time_str, medicine.disease,
-                      medicine.is_diabetic, medicine.category, medicine.meal_timing, medicine.medicine_id))
-            else:
-                cursor.execute('''
-                    INSERT INTO medicines (patient_id, name, dosage, time_str, disease, is_diabetic, category, meal_timing)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (patient.patient_id, medicine.name, medicine.dosage, medicine.time_str,
-                      medicine.disease, medicine.is_diabetic, medicine.category, medicine.meal_timing))
-                medicine.medicine_id = cursor.lastrowid
-        
-        self.conn.commit()
+        patients, self.load_stats = load_patients(self.db.reader())
+        self.patients = PatientRegistry(patients)
+        self.reminder_index.rebuild(self.patients)
+        print(f"Loaded {self.load_stats['patients']} patients and {self.load_stats['medicines']} medicines "
+              f"in {self.load_stats['total_ms']:.1f} ms (query {self.load_stats['query_ms']:.1f} ms, "
+              f"build {self.load_stats['build_ms']:.1f} ms)")
+
+    def save_patient(self, patient, medicines=None):
+        self.patient_writer.save(patient, medicines)
 
     def update_time(self):
         current_time = datetime.now().strftime("%I:%M:%S %p")
         self.time_label.config(text=f"Current Time: {current_time}")
         self.root.after(1000, self.update_time)
     
+    def _show_busy(self, running):
+        if running:
+            self.busy_label.config(text=f"Working: {', '.join(running)}")
+            if not self.busy_bar.winfo_ismapped():
+                self.busy_bar.pack(side=tk.LEFT)
+                self.busy_bar.start(15)
+            self.root.config(cursor="watch")
+        else:
+            self.busy_label.config(text="")
+            self.busy_bar.stop()
+            self.busy_bar.pack_forget()
+            self.root.config(cursor="")
+    
+    def _on_models_loaded(self, models):
+        self.ml_model = models.ml_model
+        self.disease_encoder = models.disease_encoder
+        self.category_encoder = models.category_encoder
+        self.disease_predictor = models.disease_predictor
+        self.symptom_encoder = models.symptom_encoder
+        self.symptom_predictor = models.symptom_predictor
+        self.category_predictor = models.category_predictor
+        self.models_state = "ready"
+        print(f"✅ ML models loaded successfully in {models.load_ms:.0f} ms.")
+        self._show_models_state()
+
+    def _on_models_failed(self, e):
+        print(f"⚠️ ML Model loading failed: {e}")
+        self.models_state = "failed"
+        self._show_models_state()
+        messagebox.showwarning("Warning", "ML models could not be loaded. Disease prediction features will be disabled.")
+
+    def _show_models_state(self):
+        text, color = {
+            "loading": ("ML models: loading...", "gray"),
+            "ready": ("ML models: ready", "green"),
+            "failed": ("ML models: unavailable", "red"),
+        }[self.models_state]
+        self.models_label.config(text=text, foreground=color)
+        
+        self._model_buttons = [button for button in self._model_buttons if button.winfo_exists()]
+        for button in self._model_buttons:
+            button.config(state="normal" if self.models_state == "ready" else "disabled")
+
+    def _register_model_button(self, button):
+        # Prediction buttons stay disabled until the models have arrived.
+        self._model_buttons.append(button)
+        button.config(state="normal" if self.models_state == "ready" else "disabled")
+
+    def _show_task_error(self, title):
+        return lambda e: messagebox.showerror("Error", f"{title}: {e}")
+    
     def add_activity(self, message):
-        timestamp = datetime.now().strftime("%H:%M:%S")
+        # Safe from any thread: the message is queued and _pump_activity
+        # writes it to the widget on the Tk thread. Posts from the Tk thread
+        # wake an idle pump at once; others wait at most one idle tick.
+        self.activity.post(message)
+        if self.activity_idle and self.activity_pump and threading.current_thread() is threading.main_thread():
+            self.root.after_cancel(self.activity_pump)
+            self.activity_idle = False
+            self.activity_pump = self.root.after_idle(self._pump_activity)
+
+    def _pump_activity(self):
+        lines = self.activity.drain()
+        if lines:
+            self._append_activity_lines(lines)
+        self.activity_idle = not lines
+        delay = ACTIVITY_IDLE_MS if self.activity_idle else ACTIVITY_PUMP_MS
+        self.activity_pump = self.root.after(delay, self._pump_activity)
+
+    def _append_activity_lines(self, lines):
         self.activity_text.config(state="normal")
-        self.activity_text.insert(tk.END, f"[{timestamp}] {message}\n")
+        self.activity_text.insert(tk.END, "\n".join(lines) + "\n")
+        # Keep the widget no longer than the ring buffer behind it.
+        excess = int(self.activity_text.index("end-1c").split(".")[0]) - 1 - self.activity.capacity
+        if excess > 0:
+            self.activity_text.delete("1.0", f"{excess + 1}.0")
         self.activity_text.config(state="disabled")
         self.activity_text.see(tk.END)
     
@@ -593,16 +570,31 @@ class MedicineReminderApp:
                 messagebox.showerror("Error", "Please enter a valid age")
                 return
 
-            self.current_patient = Patient(name, int(age), gender, medical_history, chronic_diseases)
-            self.save_patient(self.current_patient)
-            self.patients.append(self.current_patient)
-            self.medicine_button.config(state="normal")
+            patient = Patient(name, int(age), gender, medical_history, chronic_diseases)
+            save_button.config(state="disabled")
+            
+            # No owner: the row is committed even if the dialog is closed
+            # meanwhile, so the in-memory state must always follow it.
+            def on_saved(_):
+                self.current_patient = patient
+                self.patients.append(patient)
+                self.stats.add_patient(patient)
+                self.medicine_button.config(state="normal")
+                self.add_activity(f"Added new patient: {name}")
+                
+                if patient_window.winfo_exists():
+                    patient_window.destroy()
+                messagebox.showinfo("Success", "Patient info saved successfully!")
+            
+            def on_failed(e):
+                if save_button.winfo_exists():
+                    save_button.config(state="normal")
+                messagebox.showerror("Error", f"Failed to save patient: {e}")
             
-            patient_window.destroy()
-            self.add_activity(f"Added new patient: {name}")
-            messagebox.showinfo("Success", "Patient info saved successfully!")
+            self.tasks.run("save_patient", self.save_patient, patient, on_done=on_saved, on_error=on_failed)
         
-        ttk.Button(button_frame, text="Save", command=save_patient_info).pack(side=tk.RIGHT, padx=5)
+        save_button = ttk.Button(button_frame, text="Save", command=save_patient_info)
+        save_button.pack(side=tk.RIGHT, padx=5)
         ttk.Button(button_frame, text="Cancel", command=patient_window.destroy).pack(side=tk.RIGHT)
 
     def select_existing_patient(self):
@@ -624,39 +616,21 @@ class MedicineReminderApp:
         list_frame = ttk.Frame(selection_window)
         list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
-        columns = ("ID", "Name", "Age", "Gender", "Chronic Diseases")
-        self.patient_tree = ttk.Treeview(list_frame, columns=columns, show="headings", selectmode="browse")
-        
-        for col in columns:
-            self.patient_tree.heading(col, text=col)
-            self.patient_tree.column(col, width=100)
-        
-        for patient in self.patients:
-            self.patient_tree.insert("", tk.END, values=(
-                patient.patient_id,
-                patient.name,
-                patient.age,
-                patient.gender,
-                ", ".join(patient.chronic_diseases) if patient.chronic_diseases else "None"
-            ))
-        
-        self.patient_tree.pack(fill=tk.BOTH, expand=True)
-        
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.patient_tree.yview)
-        self.patient_tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        patient_list = VirtualTreeview(list_frame, PatientPages.columns, PatientPages(self.db),
+                                       displaycolumns=("ID", "Name", "Age", "Gender", "Chronic Diseases"))
+        patient_list.pack(fill=tk.BOTH, expand=True)
         
         button_frame = ttk.Frame(selection_window, padding=10)
         button_frame.pack(fill=tk.X)
         
         def on_select():
-            selected_item = self.patient_tree.selection()
-            if not selected_item:
+            selected = patient_list.selection()
+            if not selected:
                 messagebox.showerror("Error", "Please select a patient")
                 return
                 
-            selected_id = int(self.patient_tree.item(selected_item, "values")[0])
-            self.current_patient = next((p for p in self.patients if p.patient_id == selected_id), None)
+            selected_id = selected[0]
+            self.current_patient = self.patients.get(selected_id)
             self.medicine_button.config(state="normal")
             
             selection_window.destroy()
@@ -666,16 +640,30 @@ class MedicineReminderApp:
         ttk.Button(button_frame, text="Select", command=on_select).pack(side=tk.RIGHT, padx=5)
         ttk.Button(button_frame, text="Cancel", command=selection_window.destroy).pack(side=tk.RIGHT)
         
+        pending_search = {"job": None, "term": None}
+        
+        def run_search():
+            pending_search["job"] = None
+            term = search_entry.get().strip()
+            if term == pending_search["term"]:
+                return
+            pending_search["term"] = term
+            if not term:
+                patient_list.refresh(PatientPages(self.db))
+                return
+            
+            def on_results(patient_ids):
+                # A slower, older query must not overwrite a newer one.
+                if term == pending_search["term"]:
+                    patient_list.refresh(PatientPages(self.db, patient_ids))
+            
+            self.tasks.run("search_patients", self.patient_search.search, term,
+                           on_done=on_results, on_error=self._show_task_error("Search failed"), owner=selection_window)
+        
         def update_search(*args):
-            search_term = search_entry.get().lower()
-            for item in self.patient_tree.get_children():
-                values = self.patient_tree.item(item, "values")
-                if any(search_term in str(value).lower() for value in values):
-                    self.patient_tree.item(item, tags=('match',))
-                    self.patient_tree.detach(item)
-                    self.patient_tree.reattach(item, '', 'end')
-                else:
-                    self.patient_tree.detach(item)
+            if pending_search["job"]:
+                selection_window.after_cancel(pending_search["job"])
+            pending_search["job"] = selection_window.after(SEARCH_DEBOUNCE_MS, run_search)
         
         search_entry.bind("<KeyRelease>", update_search)
 
@@ -688,34 +676,21 @@ class MedicineReminderApp:
         delete_window.title("Delete Patient")
         delete_window.geometry("500x400")
         
-        columns = ("ID", "Name", "Age", "Gender")
-        tree = ttk.Treeview(delete_window, columns=columns, show="headings")
-        
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=100)
-        
-        for patient in self.patients:
-            tree.insert("", tk.END, values=(
-                patient.patient_id,
-                patient.name,
-                patient.age,
-                patient.gender
-            ))
-        
-        tree.pack(fill=tk.BOTH, expand=True)
+        patient_list = VirtualTreeview(delete_window, PatientPages.columns, PatientPages(self.db),
+                                       displaycolumns=("ID", "Name", "Age", "Gender"))
+        patient_list.pack(fill=tk.BOTH, expand=True)
         
         button_frame = ttk.Frame(delete_window, padding=10)
         button_frame.pack(fill=tk.X)
         
         def on_delete():
-            selected_item = tree.selection()
-            if not selected_item:
+            selected = patient_list.selection()
+            if not selected:
                 messagebox.showerror("Error", "Please select a patient to delete")
                 return
                 
-            selected_id = int(tree.item(selected_item, "values")[0])
-            patient_to_delete = next((p for p in self.patients if p.patient_id == selected_id), None)
+            selected_id = selected[0]
+            patient_to_delete = self.patients.get(selected_id)
             
             if not patient_to_delete:
                 messagebox.showerror("Error", "Selected patient not found")
@@ -724,23 +699,31 @@ class MedicineReminderApp:
             confirm = messagebox.askyesno("Confirm Delete", 
                                          f"Are you sure you want to delete patient {patient_to_delete.name} and all their medicines?")
             if confirm:
-                cursor = self.conn.cursor()
-                cursor.execute("DELETE FROM medicines WHERE patient_id = ?", (selected_id,))
-                cursor.execute("DELETE FROM patients WHERE patient_id = ?", (selected_id,))
-                self.conn.commit()
-                
-                self.patients = [p for p in self.patients if p.patient_id != selected_id]
-                self.add_activity(f"Deleted patient: {patient_to_delete.name}")
-                messagebox.showinfo("Success", "Patient deleted successfully")
-                delete_window.destroy()
+                def on_deleted(_):
+                    self.patients.remove(patient_to_delete)
+                    self.reminder_index.remove_patient(patient_to_delete)
+                    self.stats.remove_patient(patient_to_delete)
+                    self.add_activity(f"Deleted patient: {patient_to_delete.name}")
+                    messagebox.showinfo("Success", "Patient deleted successfully")
+                    delete_window.destroy()
+                    
+                    if self.current_patient and self.current_patient.patient_id == selected_id:
+                        self.current_patient = None
+                        self.medicine_button.config(state="disabled")
                 
-                if self.current_patient and self.current_patient.patient_id == selected_id:
-                    self.current_patient = None
-                    self.medicine_button.config(state="disabled")
+                self.tasks.run("delete_patient", self.db.transaction, self._delete_patient_rows, selected_id,
+                               on_done=on_deleted, on_error=self._show_task_error("Failed to delete patient"))
         
         ttk.Button(button_frame, text="Delete", command=on_delete, style='Danger.TButton').pack(side=tk.RIGHT, padx=5)
         ttk.Button(button_frame, text="Cancel", command=delete_window.destroy).pack(side=tk.RIGHT)
 
+    def _delete_patient_rows(self, conn, patient_id):
+        conn.execute("DELETE FROM medicines WHERE patient_id = ?", (patient_id,))
+        conn.execute("DELETE FROM patient_conditions WHERE patient_id = ?", (patient_id,))
+        conn.execute("DELETE FROM dose_events WHERE patient_id = ?", (patient_id,))
+        conn.execute("DELETE FROM dose_daily WHERE patient_id = ?", (patient_id,))
+        conn.execute("DELETE FROM patients WHERE patient_id = ?", (patient_id,))
+
     def add_medicine_info(self):
         if not self.current_patient:
             messagebox.showerror("Error", "No patient selected")
@@ -809,7 +792,7 @@ class MedicineReminderApp:
         button_frame.pack(fill=tk.X)
         
         def predict_disease_from_symptoms():
-            if not self.disease_predictor or not self.symptom_encoder:
+            if not self.symptom_predictor:
                 messagebox.showerror("Error", 
                                "Disease prediction model not loaded.\n"
                                "Please make sure all model files exist in the medicine_model directory.")
@@ -820,32 +803,21 @@ class MedicineReminderApp:
                 return
             
             try:
-                symptoms_list = [s.strip().lower() for s in symptoms.split(",")]
-                symptom_vector = self.symptom_encoder.transform(symptoms_list)
-                predicted_disease = self.disease_predictor.predict([symptom_vector])[0]
+                predicted_disease = self.symptom_predictor.predict(symptoms)
                 
                 disease_entry.delete(0, tk.END)
                 disease_entry.insert(0, predicted_disease)
                 
-                if self.ml_model:
+                if self.category_predictor:
                     try:
                         age = self.current_patient.age
                         is_diabetic_flag = int(is_diabetic_var.get())
                         has_hypertension = int("hypertension" in [d.lower() for d in self.current_patient.chronic_diseases])
                         
-                        if predicted_disease.lower() in self.disease_encoder.classes_:
-                            disease_encoded = self.disease_encoder.transform([predicted_disease.lower()])[0]
-                            
-                            input_df = pd.DataFrame([{
-                                "age": age,
-                                "is_diabetic": is_diabetic_flag,
-                                "has_hypertension": has_hypertension,
-                                "disease_encoded": disease_encoded
-                            }])
-                            
-                            pred_encoded = self.ml_model.predict(input_df)[0]
-                            predicted_category = self.category_encoder.inverse_transform([pred_encoded])[0]
-                            
+                        predicted_category = self.category_predictor.predict(
+                            age, is_diabetic_flag, has_hypertension, predicted_disease
+                        )
+                        if predicted_category:
                             category_var.set(predicted_category)
                             self.add_activity(f"Predicted disease: {predicted_disease}, suggested category: {predicted_category}")
                     except Exception as e:
@@ -890,14 +862,33 @@ class MedicineReminderApp:
                 meal_timing=meal_timing
             )
             
-            self.current_patient.medicines.append(medicine)
-            self.save_patient(self.current_patient)
-            self.add_activity(f"Added medicine {medicine_name} for {self.current_patient.name}")
-            messagebox.showinfo("Success", "Medicine saved successfully!")
-            medicine_window.destroy()
-        
-        ttk.Button(button_frame, text="Predict from Symptoms", command=predict_disease_from_symptoms).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text="Save", command=save_medicine_info).pack(side=tk.RIGHT, padx=5)
+            patient = self.current_patient
+            patient.medicines.append(medicine)
+            save_button.config(state="disabled")
+            
+            def on_saved(_):
+                self.patients.add_medicine(medicine)
+                self.reminder_index.add(medicine)
+                self.stats.add_medicine(medicine)
+                self.add_activity(f"Added medicine {medicine_name} for {patient.name}")
+                messagebox.showinfo("Success", "Medicine saved successfully!")
+                if medicine_window.winfo_exists():
+                    medicine_window.destroy()
+            
+            def on_failed(e):
+                patient.medicines.remove(medicine)
+                if save_button.winfo_exists():
+                    save_button.config(state="normal")
+                messagebox.showerror("Error", f"Failed to save medicine: {e}")
+            
+            self.tasks.run("save_medicine", self.save_patient, patient, list(patient.medicines),
+                           on_done=on_saved, on_error=on_failed)
+        
+        predict_btn = ttk.Button(button_frame, text="Predict from Symptoms", command=predict_disease_from_symptoms)
+        predict_btn.pack(side=tk.LEFT, padx=5)
+        self._register_model_button(predict_btn)
+        save_button = ttk.Button(button_frame, text="Save", command=save_medicine_info)
+        save_button.pack(side=tk.RIGHT, padx=5)
         ttk.Button(button_frame, text="Cancel", command=medicine_window.destroy).pack(side=tk.RIGHT)
 
     def delete_medicine(self):
@@ -913,39 +904,25 @@ class MedicineReminderApp:
         list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         columns = ("ID", "Name", "Dosage", "Time", "Disease", "Category")
-        medicine_tree = ttk.Treeview(list_frame, columns=columns, show="headings", selectmode="browse")
-        
-        for col in columns:
-            medicine_tree.heading(col, text=col)
-            medicine_tree.column(col, width=100)
-        
-        for med in self.current_patient.medicines:
-            medicine_tree.insert("", tk.END, values=(
-                med.medicine_id,
-                med.name,
-                med.dosage,
-                med.time_str,
-                med.disease,
-                med.category
-            ))
-        
-        medicine_tree.pack(fill=tk.BOTH, expand=True)
-        
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=medicine_tree.yview)
-        medicine_tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        medicine_source = ListSource(
+            self.current_patient.medicines,
+            lambda med: (med.medicine_id, med.name, med.dosage, med.time_str, med.disease, med.category),
+            key=lambda med: med.medicine_id
+        )
+        medicine_list = VirtualTreeview(list_frame, columns, medicine_source)
+        medicine_list.pack(fill=tk.BOTH, expand=True)
         
         button_frame = ttk.Frame(delete_window, padding=10)
         button_frame.pack(fill=tk.X)
         
         def on_delete():
-            selected_item = medicine_tree.selection()
-            if not selected_item:
+            selected = medicine_list.selection()
+            if not selected:
                 messagebox.showerror("Error", "Please select a medicine to delete")
                 return
                 
-            selected_id = int(medicine_tree.item(selected_item, "values")[0])
-            medicine_to_delete = next((m for m in self.current_patient.medicines if m.medicine_id == selected_id), None)
+            selected_id = selected[0]
+            medicine_to_delete = self.patients.get_medicine(selected_id)
             
             if not medicine_to_delete:
                 messagebox.showerror("Error", "Selected medicine not found")
@@ -954,20 +931,24 @@ class MedicineReminderApp:
             confirm = messagebox.askyesno("Confirm Delete", 
                                          f"Are you sure you want to delete {medicine_to_delete.name}?")
             if confirm:
-                cursor = self.conn.cursor()
-                cursor.execute("DELETE FROM medicines WHERE medicine_id = ?", (selected_id,))
-                self.conn.commit()
+                patient = self.current_patient
                 
-                self.current_patient.medicines = [m for m in self.current_patient.medicines if m.medicine_id != selected_id]
-                self.add_activity(f"Deleted medicine {medicine_to_delete.name} for {self.current_patient.name}")
-                messagebox.showinfo("Success", "Medicine deleted successfully")
-                delete_window.destroy()
+                def on_deleted(_):
+                    self.patients.remove_medicine(medicine_to_delete)
+                    self.reminder_index.remove(medicine_to_delete)
+                    self.stats.remove_medicine(medicine_to_delete)
+                    self.add_activity(f"Deleted medicine {medicine_to_delete.name} for {patient.name}")
+                    messagebox.showinfo("Success", "Medicine deleted successfully")
+                    delete_window.destroy()
+                
+                self.tasks.run("delete_medicine", self.db.execute, "DELETE FROM medicines WHERE medicine_id = ?", (selected_id,),
+                               on_done=on_deleted, on_error=self._show_task_error("Failed to delete medicine"))
         
         ttk.Button(button_frame, text="Delete", command=on_delete, style='Danger.TButton').pack(side=tk.RIGHT, padx=5)
         ttk.Button(button_frame, text="Cancel", command=delete_window.destroy).pack(side=tk.RIGHT)
 
     def predict_disease_from_symptoms(self):
-        if not self.disease_predictor:
+        if not self.symptom_predictor:
             messagebox.showerror("Error", "Disease prediction model not loaded")
             return
             
@@ -998,17 +979,23 @@ class MedicineReminderApp:
                 messagebox.showerror("Error", "Please enter symptoms")
                 return
                 
-            try:
-                symptoms_list = [s.strip().lower() for s in symptoms.split(",")]
-                symptom_vector = self.symptom_encoder.transform(symptoms_list)
-                predicted_disease = self.disease_predictor.predict([symptom_vector])[0]
-                
+            def on_predicted(predicted_disease):
+                predict_button.config(state="normal")
                 result_label.config(text=f"Predicted Disease: {predicted_disease}")
                 self.add_activity(f"Predicted disease '{predicted_disease}' from symptoms: {symptoms}")
-            except Exception as e:
+            
+            def on_failed(e):
+                predict_button.config(state="normal")
+                result_label.config(text="")
                 messagebox.showerror("Error", f"Failed to predict disease: {e}")
+            
+            predict_button.config(state="disabled")
+            result_label.config(text="Predicting...")
+            self.tasks.run("predict_disease", self.symptom_predictor.predict, symptoms,
+                           on_done=on_predicted, on_error=on_failed, owner=predict_window)
         
-        ttk.Button(button_frame, text="Predict", command=predict_disease).pack(side=tk.RIGHT, padx=5)
+        predict_button = ttk.Button(button_frame, text="Predict", command=predict_disease)
+        predict_button.pack(side=tk.RIGHT, padx=5)
         ttk.Button(button_frame, text="Close", command=predict_window.destroy).pack(side=tk.RIGHT)
 
     def show_admin_requests(self):
@@ -1039,12 +1026,14 @@ class MedicineReminderApp:
                 
             username = tree.item(selected, "values")[0]
             
-            cursor = self.conn.cursor()
-            cursor.execute("UPDATE users SET role = 'admin', approved = 1 WHERE username = ?", (username,))
-            self.conn.commit()
+            def on_approved(_):
+                if tree.winfo_exists() and tree.exists(selected[0]):
+                    tree.delete(selected[0])
+                messagebox.showinfo("Approved", f"{username} is now an admin")
             
-            messagebox.showinfo("Approved", f"{username} is now an admin")
-            tree.delete(selected)
+            self.tasks.run("approve_request", self.db.execute,
+                           "UPDATE users SET role = 'admin', approved = 1 WHERE username = ?", (username,),
+                           on_done=on_approved, on_error=self._show_task_error("Failed to approve request"))
         
         def deny_request():
             selected = tree.selection()
@@ -1066,7 +1055,7 @@ class MedicineReminderApp:
             
         settings_window = tk.Toplevel(self.root)
         settings_window.title("System Settings")
-        settings_window.geometry("400x300")
+        settings_window.geometry("500x400")
         
         tk.Label(settings_window, text="System Configuration", font=("Arial", 12)).pack(pady=10)
         
@@ -1080,6 +1069,13 @@ class MedicineReminderApp:
         ttk.Combobox(settings_window, textvariable=backup_var, 
                     values=["Daily", "Weekly", "Monthly"]).pack()
         
+        tk.Label(settings_window, text="Background Task Latency:").pack()
+        latency_text = tk.Text(settings_window, height=6, width=60, wrap=tk.NONE)
+        for name, histogram in sorted(self.tasks.histograms.items()):
+            latency_text.insert(tk.END, f"{name}: {histogram.summary()}\n")
+        latency_text.config(state="disabled")
+        latency_text.pack(padx=10)
+        
         def save_settings():
             messagebox.showinfo("Saved", "Settings saved successfully")
             settings_window.destroy()
@@ -1101,11 +1097,14 @@ class MedicineReminderApp:
             tree.heading(col, text=col)
             tree.column(col, width=100)
         
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT username, role, approved FROM users")
-        for user in cursor.fetchall():
-            status = "Approved" if user[2] else "Pending"
-            tree.insert("", tk.END, values=(user[0], user[1], status))
+        def on_users_loaded(users):
+            for user in users:
+                status = "Approved" if user[2] else "Pending"
+                tree.insert("", tk.END, values=(user[0], user[1], status))
+        
+        self.tasks.run("load_users", self.db.query, "SELECT username, role, approved FROM users",
+                       on_done=on_users_loaded, on_error=self._show_task_error("Failed to load users"),
+                       owner=user_window)
         
         tree.pack(fill=tk.BOTH, expand=True)
         
@@ -1142,16 +1141,18 @@ class MedicineReminderApp:
             ttk.Checkbutton(edit_window, text="Approved", variable=approved_var).pack()
             
             def save_changes():
-                cursor = self.conn.cursor()
-                cursor.execute("UPDATE users SET role = ?, approved = ? WHERE username = ?",
-                             (role_var.get(), approved_var.get(), username))
-                self.conn.commit()
+                role, approved = role_var.get(), approved_var.get()
                 
-                status = "Approved" if approved_var.get() else "Pending"
-                tree.item(selected, values=(username, role_var.get(), status))
+                def on_saved(_):
+                    if tree.winfo_exists() and tree.exists(selected[0]):
+                        tree.item(selected[0], values=(username, role, "Approved" if approved else "Pending"))
+                    messagebox.showinfo("Saved", "Changes saved successfully")
+                    if edit_window.winfo_exists():
+                        edit_window.destroy()
                 
-                messagebox.showinfo("Saved", "Changes saved successfully")
-                edit_window.destroy()
+                self.tasks.run("save_user", self.db.execute,
+                               "UPDATE users SET role = ?, approved = ? WHERE username = ?", (role, approved, username),
+                               on_done=on_saved, on_error=self._show_task_error("Failed to save user"))
             
             tk.Button(edit_window, text="Save", command=save_changes).pack(pady=10)
         
@@ -1168,11 +1169,13 @@ class MedicineReminderApp:
                 return
                 
             if messagebox.askyesno("Confirm", f"Delete user {username} permanently?"):
-                cursor = self.conn.cursor()
-                cursor.execute("DELETE FROM users WHERE username = ?", (username,))
-                self.conn.commit()
-                tree.delete(selected)
-                messagebox.showinfo("Deleted", "User deleted successfully")
+                def on_deleted(_):
+                    if tree.winfo_exists() and tree.exists(selected[0]):
+                        tree.delete(selected[0])
+                    messagebox.showinfo("Deleted", "User deleted successfully")
+                
+                self.tasks.run("delete_user", self.db.execute, "DELETE FROM users WHERE username = ?", (username,),
+                               on_done=on_deleted, on_error=self._show_task_error("Failed to delete user"))
         
         tk.Button(btn_frame, text="Edit User", command=edit_user).pack(side=tk.LEFT)
         
@@ -1196,7 +1199,7 @@ class MedicineReminderApp:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_file = os.path.join(backup_dir, f"backup_{timestamp}.db")
             
-            shutil.copy2('medicine_reminder.db', backup_file)
+            shutil.copy2(DB_PATH, backup_file)
             
             messagebox.showinfo("Backup", f"Backup created successfully at:\n{backup_file}")
             self.add_activity(f"Created backup: {backup_file}")
@@ -1204,102 +1207,197 @@ class MedicineReminderApp:
             messagebox.showerror("Error", f"Backup failed: {str(e)}")
 
     def check_reminders(self):
-        last_minute_checked = -1
-        
-        while not self.stop_thread:
-            try:
-                now = datetime.now()
-                current_time = now.time()
-                current_minute = now.minute
-                
-                if current_minute != last_minute_checked:
-                    last_minute_checked = current_minute
-                    
-                    self.root.after(0, lambda: self.status_label.config(
-                        text=f"Reminder active - Current time: {now.strftime('%I:%M:%S %p')}"
-                    ))
-                    
-                    today = now.strftime('%Y-%m-%d')
-                    
-                    for patient in self.patients:
-                        for medicine in patient.medicines:
-                            if (current_time.hour == medicine.time_obj.hour and 
-                                current_time.minute == medicine.time_obj.minute):
-                                
-                                reminder_key = f"{patient.name}_{medicine.name}_{today}_{medicine.time_obj.hour}:{medicine.time_obj.minute}"
-                                
-                                if reminder_key not in self.reminder_history:
-                                    self.reminder_history.append(reminder_key)
-                                    self.trigger_reminder(patient, medicine)
-                    
-                    self.reminder_history = [r for r in self.reminder_history if today in r]
-                
-                time.sleep(1)
-            except Exception as e:
-                print(f"Error in reminder thread: {e}")
-                time.sleep(5)
+        self.reminder_driver.run()
+
+    def fire_due_reminders(self, now, current_minute):
+        self.root.after(0, lambda: self.status_label.config(
+            text=f"Reminder active - Current time: {now.strftime('%I:%M:%S %p')}"
+        ))
+        
+        today = now.strftime('%Y-%m-%d')
+        due_entries = self.reminder_index.due(current_minute)
+        if LAZY_LOADING:
+            due_entries = self.patients.resolve(due_entries)
+        due = {medicine.medicine_id: medicine for medicine in due_entries}
+        
+        fired = []
+        for medicine_id in self.reminder_log.claim(today, current_minute, due):
+            medicine = due[medicine_id]
+            self.trigger_reminder(medicine.patient, medicine, today)
+            self.reminder_log.mark_fired(today, current_minute, medicine_id)
+            fired.append((medicine.patient.patient_id, medicine_id, today, current_minute))
+        if fired:
+            self.dose_log.record_many("fired", fired)
 
-    def trigger_reminder(self, patient, medicine):
-        self.root.after(0, lambda: self._show_reminder(patient, medicine))
-        self._play_reminder_sound()
+    def trigger_reminder(self, patient, medicine, day):
+        self.alerts.post((patient, medicine, day))
         self.add_activity(f"Triggered reminder for {patient.name}: {medicine.name} at {medicine.time_str}")
 
-    def _show_reminder(self, patient, medicine):
-        reminder_text = f"MEDICINE REMINDER\n\n"
-        reminder_text += f"Patient: {patient.name} ({patient.age}, {patient.gender})\n"
-        reminder_text += f"Medicine: {medicine.name} ({medicine.dosage})\n"
-        reminder_text += f"Category: {medicine.category}\n"
-        reminder_text += f"For: {medicine.disease}\n"
-        reminder_text += f"Take: {medicine.meal_timing}\n"
-        reminder_text += f"Time: {datetime.now().strftime('%I:%M %p')}\n"
-        
-        if medicine.is_diabetic:
-            reminder_text += "\n⚠️ DIABETIC MEDICATION ⚠️\n"
+    def _deliver_alerts(self, batch):
+        self.root.after(0, lambda: self._show_reminders(batch))
 
+    def _show_reminders(self, batch):
+        # Everything due lands in one window, grouped by patient; a window that
+        # is still open from an earlier tick is reused rather than stacked.
         try:
-            reminder_window = tk.Toplevel(self.root)
-            reminder_window.title("Medicine Reminder")
-            reminder_window.geometry("400x300")
-            reminder_window.lift()
-            reminder_window.attributes('-topmost', True)
-            
-            reminder_frame = tk.Frame(reminder_window, bg="#FFD700", padx=20, pady=20)
-            reminder_frame.pack(fill=tk.BOTH, expand=True)
-            
-            reminder_label = tk.Label(reminder_frame, 
-                                    text=reminder_text,
-                                    font=("Arial", 12, "bold"),
-                                    bg="#FFD700",
-                                    justify=tk.LEFT)
-            reminder_label.pack(pady=10)
+            if self.reminder_window is None or not self.reminder_window.winfo_exists():
+                self._create_reminder_window()
             
-            button_frame = tk.Frame(reminder_frame, bg="#FFD700")
-            button_frame.pack(pady=10)
+            tree = self.reminder_tree
+            for patient, medicine, day in batch:
+                group = f"patient-{patient.patient_id}"
+                if not tree.exists(group):
+                    tree.insert("", tk.END, iid=group, open=True,
+                                text=f"{patient.name} ({patient.age}, {patient.gender})")
+                item = tree.insert(group, tk.END,
+                                   text=f"⚠️ {medicine.name}" if medicine.is_diabetic else medicine.name,
+                                   values=(medicine.dosage, medicine.category, medicine.disease,
+                                           medicine.meal_timing, medicine.time_str),
+                                   tags=("diabetic",) if medicine.is_diabetic else ())
+                self.reminder_items[item] = (patient, medicine, day)
             
-            def mark_taken():
-                reminder_window.destroy()
-                self.add_activity(f"Marked {medicine.name} as taken for {patient.name}")
-                messagebox.showinfo("Confirmation", f"Marked {medicine.name} as taken!")
-            
-            take_button = tk.Button(button_frame, 
-                                text="Mark as Taken",
-                                font=("Arial", 12, "bold"),
-                                bg="#4CAF50",
-                                fg="white",
-                                command=mark_taken)
-            take_button.pack(pady=10)
-            
-            reminder_window.after(60000, reminder_window.destroy)
+            self._update_reminder_header()
+            self.reminder_window.lift()
+            if self.reminder_close_job:
+                self.reminder_window.after_cancel(self.reminder_close_job)
+            self.reminder_close_job = self.reminder_window.after(60000, self._dismiss_reminders)
         except Exception as e:
             print(f"Error showing reminder: {e}")
 
-    def _play_reminder_sound(self):
-        try:
-            for _ in range(7):
-                winsound.Beep(1000, 500)
-                time.sleep(0.3)
-        except Exception as e:
-            print(f"Sound error: {e}")
+    def _create_reminder_window(self):
+        reminder_window = tk.Toplevel(self.root)
+        reminder_window.title("Medicine Reminders")
+        reminder_window.geometry("750x400")
+        reminder_window.lift()
+        reminder_window.attributes('-topmost', True)
+        reminder_window.protocol("WM_DELETE_WINDOW", self._dismiss_reminders)
+        
+        reminder_frame = tk.Frame(reminder_window, bg="#FFD700", padx=20, pady=20)
+        reminder_frame.pack(fill=tk.BOTH, expand=True)
+        
+        header_label = tk.Label(reminder_frame, font=("Arial", 14, "bold"), bg="#FFD700")
+        header_label.pack(pady=(0, 10))
+        
+        button_frame = tk.Frame(reminder_frame, bg="#FFD700")
+        button_frame.pack(side=tk.BOTTOM, pady=(10, 0))
+        
+        tree_frame = tk.Frame(reminder_frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+        
+        columns = ("Dosage", "Category", "For", "Take", "Time")
+        tree = ttk.Treeview(tree_frame, columns=columns, selectmode="extended")
+        tree.heading("#0", text="Patient / Medicine")
+        tree.column("#0", width=220, anchor=tk.W)
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=90, anchor=tk.W)
+        tree.tag_configure("diabetic", foreground="#B00020")
+        
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscroll=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(fill=tk.BOTH, expand=True)
+        
+        tk.Button(button_frame, 
+                  text="Mark Selected as Taken",
+                  font=("Arial", 12, "bold"),
+                  bg="#4CAF50",
+                  fg="white",
+                  command=lambda: self._mark_reminders_taken(tree.selection())).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, 
+                  text="Mark All as Taken",
+                  font=("Arial", 12, "bold"),
+                  bg="#4CAF50",
+                  fg="white",
+                  command=lambda: self._mark_reminders_taken(tree.get_children())).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, 
+                  text=f"Snooze {SNOOZE_MINUTES} min",
+                  font=("Arial", 12, "bold"),
+                  bg="#FF9800",
+                  fg="white",
+                  command=lambda: self._snooze_reminders(tree.selection())).pack(side=tk.LEFT, padx=5)
+        
+        self.reminder_window = reminder_window
+        self.reminder_tree = tree
+        self.reminder_header = header_label
+        self.reminder_items = {}
+        self.reminder_close_job = None
+
+    def _update_reminder_header(self):
+        patient_count = len(self.reminder_tree.get_children())
+        self.reminder_header.config(
+            text=f"MEDICINE REMINDER - {len(self.reminder_items)} dose(s) for {patient_count} patient(s)"
+        )
+
+    def _mark_reminders_taken(self, selection):
+        items = self._take_reminder_items(selection)
+        if not items:
+            return
+        
+        self.dose_log.record_many("taken", [
+            (patient.patient_id, medicine.medicine_id, day, medicine.minute_of_day) for patient, medicine, day in items
+        ])
+        for patient, medicine, _ in items:
+            self.add_activity(f"Marked {medicine.name} as taken for {patient.name}")
+        
+        if not self.reminder_items:
+            self._close_reminder_window()
+            messagebox.showinfo("Confirmation", f"Marked {len(items)} dose(s) as taken!")
+
+    def _snooze_reminders(self, selection):
+        items = self._take_reminder_items(selection)
+        if not items:
+            return
+        
+        self.dose_log.record_many("snoozed", [
+            (patient.patient_id, medicine.medicine_id, day, medicine.minute_of_day) for patient, medicine, day in items
+        ])
+        for patient, medicine, day in items:
+            self.add_activity(f"Snoozed {medicine.name} for {patient.name}")
+            self.root.after(SNOOZE_MINUTES * 60000, lambda entry=(patient, medicine, day): self.alerts.post(entry))
+        
+        if not self.reminder_items:
+            self._close_reminder_window()
+
+    def _dismiss_reminders(self):
+        items = list(self.reminder_items.values())
+        if items:
+            self.dose_log.record_many("missed", [
+                (patient.patient_id, medicine.medicine_id, day, medicine.minute_of_day) for patient, medicine, day in items
+            ])
+            for patient, medicine, _ in items:
+                self.add_activity(f"Missed {medicine.name} for {patient.name}")
+        self.reminder_items = {}
+        self._close_reminder_window()
+
+    def _close_reminder_window(self):
+        # after() timers outlive the widget they were set on; a stale
+        # auto-dismiss would otherwise close the next window as missed.
+        if self.reminder_close_job:
+            self.reminder_window.after_cancel(self.reminder_close_job)
+            self.reminder_close_job = None
+        self.reminder_window.destroy()
+
+    def _take_reminder_items(self, selection):
+        tree = self.reminder_tree
+        iids = []
+        for iid in selection:
+            iids.extend(tree.get_children(iid) if iid not in self.reminder_items else (iid,))
+        iids = [iid for iid in dict.fromkeys(iids) if iid in self.reminder_items]
+        if not iids:
+            messagebox.showwarning("Warning", "Please select doses first", parent=self.reminder_window)
+            return []
+        
+        items = []
+        for iid in iids:
+            items.append(self.reminder_items.pop(iid))
+            parent = tree.parent(iid)
+            tree.delete(iid)
+            if not tree.get_children(parent):
+                tree.delete(parent)
+        if self.reminder_items:
+            self._update_reminder_header()
+        return items
 
     def show_dashboard(self):
         dashboard_window = tk.Toplevel(self.root)
@@ -1322,27 +1420,24 @@ class MedicineReminderApp:
         
         tabs.pack(expand=1, fill="both")
         
-        self._create_summary_tab(summary_tab)
+        stats = self.stats.snapshot()
+        self._create_summary_tab(summary_tab, stats)
         self._create_schedule_tab(schedule_tab)
         self._create_patients_tab(patients_tab)
-        self._create_stats_tab(stats_tab)
+        self._create_stats_tab(stats_tab, stats)
         
         self.add_activity("Opened dashboard")
 
-    def _create_summary_tab(self, tab):
+    def _create_summary_tab(self, tab, stats):
         summary_frame = ttk.Frame(tab, padding=10)
         summary_frame.pack(fill=tk.BOTH, expand=True)
         
         stats_frame = ttk.Frame(summary_frame)
         stats_frame.pack(fill=tk.X, pady=10)
         
-        total_patients = len(self.patients)
-        total_medicines = sum(len(p.medicines) for p in self.patients)
-        diabetic_count = sum(1 for p in self.patients for m in p.medicines if m.is_diabetic)
-        
-        ttk.Label(stats_frame, text=f"Total Patients: {total_patients}", font=("Arial", 12)).grid(row=0, column=0, padx=20, pady=5, sticky="w")
-        ttk.Label(stats_frame, text=f"Total Medicines: {total_medicines}", font=("Arial", 12)).grid(row=1, column=0, padx=20, pady=5, sticky="w")
-        ttk.Label(stats_frame, text=f"Diabetic Medications: {diabetic_count}", font=("Arial", 12)).grid(row=2, column=0, padx=20, pady=5, sticky="w")
+        ttk.Label(stats_frame, text=f"Total Patients: {stats['patients']}", font=("Arial", 12)).grid(row=0, column=0, padx=20, pady=5, sticky="w")
+        ttk.Label(stats_frame, text=f"Total Medicines: {stats['medicines']}", font=("Arial", 12)).grid(row=1, column=0, padx=20, pady=5, sticky="w")
+        ttk.Label(stats_frame, text=f"Diabetic Medications: {stats['diabetic']}", font=("Arial", 12)).grid(row=2, column=0, padx=20, pady=5, sticky="w")
         
         activity_frame = ttk.LabelFrame(summary_frame, text="Recent Activity", padding=10)
         activity_frame.pack(fill=tk.BOTH, expand=True)
@@ -1350,12 +1445,8 @@ class MedicineReminderApp:
         activity_text = tk.Text(activity_frame, height=10, state="disabled", wrap=tk.WORD)
         activity_text.pack(fill=tk.BOTH, expand=True)
         
-        self.activity_text.config(state="normal")
-        last_activities = self.activity_text.get("1.0", tk.END).split("\n")[-11:-1]
-        self.activity_text.config(state="disabled")
-        
         activity_text.config(state="normal")
-        for activity in last_activities:
+        for activity in self.activity.recent(10):
             activity_text.insert(tk.END, activity + "\n")
         activity_text.config(state="disabled")
         
@@ -1367,37 +1458,40 @@ class MedicineReminderApp:
         schedule_frame = ttk.Frame(tab, padding=10)
         schedule_frame.pack(fill=tk.BOTH, expand=True)
         
-        ttk.Label(schedule_frame, text="Today's Medication Schedule", font=("Arial", 12, "bold")).pack(anchor=tk.W, pady=5)
+        header_frame = ttk.Frame(schedule_frame)
+        header_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(header_frame, text="Today's Medication Schedule", font=("Arial", 12, "bold")).pack(side=tk.LEFT)
+        
+        window_var = tk.StringVar(value="All day")
+        window_combo = ttk.Combobox(header_frame, textvariable=window_var, values=list(SCHEDULE_WINDOWS),
+                                    state="readonly", width=14)
+        window_combo.pack(side=tk.RIGHT)
         
         columns = ("Time", "Patient", "Medicine", "Dosage", "Disease", "Category")
-        schedule_tree = ttk.Treeview(schedule_frame, columns=columns, show="headings", height=15)
+        schedule_list = VirtualTreeview(schedule_frame, columns, ListSource([], tuple))
         
-        for col in columns:
-            schedule_tree.heading(col, text=col)
-            schedule_tree.column(col, width=100, anchor=tk.W)
-        
-        all_meds = []
-        for patient in self.patients:
-            for medicine in patient.medicines:
-                all_meds.append((
-                    medicine.time_str,
-                    patient.name,
-                    medicine.name,
-                    medicine.dosage,
-                    medicine.disease,
-                    medicine.category
-                ))
-        
-        all_meds.sort(key=lambda x: datetime.strptime(x[0], "%I:%M %p").time())
-        
-        for med in all_meds:
-            schedule_tree.insert("", tk.END, values=med)
+        def show_window(*args):
+            # The reminder index already holds every dose in minute order.
+            hours = SCHEDULE_WINDOWS[window_var.get()]
+            if hours is None:
+                entries = self.reminder_index.window(0, MINUTES_PER_DAY)
+            else:
+                now = datetime.now()
+                start = now.hour * 60 + now.minute
+                entries = self.reminder_index.window(start, start + hours * 60)
             
-        schedule_tree.pack(fill=tk.BOTH, expand=True)
+            # Lazily loaded doses are resolved one page at a time, as rows scroll into view.
+            schedule_list.refresh(ListSource(
+                [entry for _, entry in entries],
+                lambda medicine: (medicine.time_str, medicine.patient.name, medicine.name,
+                                  medicine.dosage, medicine.disease, medicine.category),
+                prepare=self.patients.resolve if LAZY_LOADING else None
+            ))
         
-        scrollbar = ttk.Scrollbar(schedule_frame, orient=tk.VERTICAL, command=schedule_tree.yview)
-        schedule_tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        window_combo.bind("<<ComboboxSelected>>", show_window)
+        show_window()
+        
+        schedule_list.pack(fill=tk.BOTH, expand=True)
 
     def _create_patients_tab(self, tab):
         patients_frame = ttk.Frame(tab, padding=10)
@@ -1405,37 +1499,17 @@ class MedicineReminderApp:
         
         ttk.Label(patients_frame, text="Patient Records", font=("Arial", 12, "bold")).pack(anchor=tk.W, pady=5)
         
-        columns = ("Name", "Age", "Gender", "Chronic Diseases", "Medicines")
-        patients_tree = ttk.Treeview(patients_frame, columns=columns, show="headings", height=15)
+        patients_list = VirtualTreeview(patients_frame, PatientPages.columns, PatientPages(self.db), column_width=120,
+                                        displaycolumns=("Name", "Age", "Gender", "Chronic Diseases", "Medicines"))
+        patients_list.pack(fill=tk.BOTH, expand=True)
         
-        for col in columns:
-            patients_tree.heading(col, text=col)
-            patients_tree.column(col, width=120, anchor=tk.W)
-        
-        for patient in self.patients:
-            patients_tree.insert("", tk.END, values=(
-                patient.name,
-                patient.age,
-                patient.gender,
-                ", ".join(patient.chronic_diseases) if patient.chronic_diseases else "None",
-                len(patient.medicines)
-            ))
-            
-        patients_tree.pack(fill=tk.BOTH, expand=True)
-        
-        scrollbar = ttk.Scrollbar(patients_frame, orient=tk.VERTICAL, command=patients_tree.yview)
-        patients_tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        def on_double_click(event):
-            item = patients_tree.selection()[0]
-            patient_name = patients_tree.item(item, "values")[0]
-            patient = next((p for p in self.patients if p.name == patient_name), None)
+        def on_double_click(patient_id):
+            patient = self.patients.get(patient_id)
             
             if patient:
                 self._show_patient_details(patient)
         
-        patients_tree.bind("<Double-1>", on_double_click)
+        patients_list.bind_row("<Double-1>", on_double_click)
 
     def _show_patient_details(self, patient):
         details_window = tk.Toplevel(self.root)
@@ -1452,13 +1526,27 @@ class MedicineReminderApp:
         ttk.Label(info_frame, text=f"Age: {patient.age}").grid(row=1, column=0, sticky="w", pady=2)
         ttk.Label(info_frame, text=f"Gender: {patient.gender}").grid(row=2, column=0, sticky="w", pady=2)
         ttk.Label(info_frame, text=f"Chronic Diseases: {', '.join(patient.chronic_diseases) if patient.chronic_diseases else 'None'}").grid(row=3, column=0, sticky="w", pady=2)
+        adherence_label = ttk.Label(info_frame, text=f"Adherence ({ADHERENCE_DAYS} days): loading...")
+        adherence_label.grid(row=4, column=0, sticky="w", pady=2)
+        
+        def on_adherence(summary):
+            if summary["rate"] is None:
+                text = "no reminders yet"
+            else:
+                text = (f"{summary['rate']:.0%} ({summary['taken']} of {summary['fired']} taken, "
+                        f"{summary['missed']} missed, {summary['snoozed']} snoozed)")
+            adherence_label.config(text=f"Adherence ({ADHERENCE_DAYS} days): {text}")
+        
+        today = datetime.now()
+        self.tasks.run("load_adherence", self.dose_log.adherence, patient.patient_id,
+                       (today - timedelta(days=ADHERENCE_DAYS - 1)).strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d'),
+                       on_done=on_adherence, on_error=self._show_task_error("Failed to load adherence"),
+                       owner=details_window)
         
         history_frame = ttk.LabelFrame(main_frame, text="Medical History", padding=10)
         history_frame.pack(fill=tk.X, pady=5)
         
         history_text = tk.Text(history_frame, height=5, wrap=tk.WORD)
-        historyاضی
-
         history_text.insert(tk.END, patient.medical_history)
         history_text.config(state="disabled")
         history_text.pack(fill=tk.X)
@@ -1488,33 +1576,26 @@ class MedicineReminderApp:
         meds_tree.configure(yscroll=scrollbar.set)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
-    def _create_stats_tab(self, tab):
+    def _create_stats_tab(self, tab, stats):
         stats_frame = ttk.Frame(tab, padding=10)
         stats_frame.pack(fill=tk.BOTH, expand=True)
         
         ttk.Label(stats_frame, text="Medication Statistics", font=("Arial", 12, "bold")).pack(anchor=tk.W, pady=5)
         
-        total_meds = sum(len(p.medicines) for p in self.patients)
-        diabetic_meds = sum(1 for p in self.patients for m in p.medicines if m.is_diabetic)
-        morning_meds = sum(1 for p in self.patients for m in p.medicines if m.time_obj.hour < 12)
-        afternoon_meds = sum(1 for p in self.patients for m in p.medicines if 12 <= m.time_obj.hour < 17)
-        evening_meds = sum(1 for p in self.patients for m in p.medicines if m.time_obj.hour >= 17)
-        
-        categories = {}
-        for p in self.patients:
-            for m in p.medicines:
-                categories[m.category] = categories.get(m.category, 0) + 1
+        total_meds = stats["medicines"]
         
         stats_text = tk.Text(stats_frame, height=15, wrap=tk.WORD)
         stats_text.insert(tk.END, "=== General Statistics ===\n")
         stats_text.insert(tk.END, f"Total Medications: {total_meds}\n")
-        stats_text.insert(tk.END, f"Diabetic Medications: {diabetic_meds}\n")
-        stats_text.insert(tk.END, f"Morning Medications: {morning_meds}\n")
-        stats_text.insert(tk.END, f"Afternoon Medications: {afternoon_meds}\n")
-        stats_text.insert(tk.END, f"Evening Medications: {evening_meds}\n\n")
+        stats_text.insert(tk.END, f"Diabetic Medications: {stats['diabetic']}\n")
+        for band in TIME_BANDS:
+            stats_text.insert(tk.END, f"{band} Medications: {stats['bands'][band]}\n")
+        stats_text.insert(tk.END, "\n")
         
         stats_text.insert(tk.END, "=== Category Distribution ===\n")
-        for category, count in categories.items():
+        if not total_meds:
+            stats_text.insert(tk.END, "No medications recorded yet\n")
+        for category, count in stats["categories"].items():
             stats_text.insert(tk.END, f"{category}: {count} ({count/total_meds:.1%})\n")
         
         stats_text.config(state="disabled")
@@ -1525,10 +1606,25 @@ class MedicineReminderApp:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
     def on_closing(self):
-        self.stop_thread = True
-        self.conn.close()
-        self.add_activity("Application closed")
-        self.root.destroy()
+        # Buffered dose events only reach the database once flushed, so they
+        # are written and the writer drained before the pool closes.
+        # The activity ring is only spilled to activity.log here, so it is
+        # written out even if stopping the workers fails.
+        try:
+            self.stop_thread = True
+            self.reminder_driver.stop()
+            self.alerts.stop()
+            self.tasks.shutdown()
+            try:
+                self.dose_log.close()
+            except Exception as e:
+                print(f"Error saving dose events: {e}")
+            self.db.close()
+        finally:
+            self.add_activity("Application closed")
+            self.root.after_cancel(self.activity_pump)
+            self.activity.close()
+            self.root.destroy()
 
 if __name__ == "__main__":
     root = tk.Tk()
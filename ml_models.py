@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+
+from inference import BatchDiseasePredictor, CategoryPredictor, DiseasePredictor, SymptomFeaturizer
+from model_cache import load_forest
+
+MODEL_DIR = "medicine_model"
+
+MODEL_FILES = {
+    "ml_model": "medicine_predictor.pkl",
+    "disease_encoder": "disease_encoder.pkl",
+    "category_encoder": "category_encoder.pkl",
+    "disease_predictor": "disease_predictor.pkl",
+    "symptom_encoder": "symptom_encoder.pkl",
+}
+
+
+def symptom_tokenizer(text):
+    return [s.strip() for s in text.split(",")]
+
+# Forests are served from memory-mapped arrays exported next to the pickle
+# (see model_cache), so they are neither unpickled nor copied per process.
+FOREST_MODELS = ("ml_model", "disease_predictor")
+
+
+class Models:
+    def __init__(self, load_ms, **models):
+        self.load_ms = load_ms
+        self.__dict__.update(models)
+
+
+def _register_tokenizer():
+    # Vectorizers pickled by older train_models.py runs refer to the
+    # tokenizer as __main__.symptom_tokenizer.
+    main_module = sys.modules["__main__"]
+    if not hasattr(main_module, "symptom_tokenizer"):
+        main_module.symptom_tokenizer = symptom_tokenizer
+
+
+def load_models(model_dir=MODEL_DIR):
+    # Runs off the Tk thread. joblib and scikit-learn are imported here
+    # rather than at module import, so the main window never waits on them.
+    start = time.perf_counter()
+    import joblib
+
+    _register_tokenizer()
+    models = {}
+    for name, filename in MODEL_FILES.items():
+        path = os.path.join(model_dir, filename)
+        models[name] = load_forest(path) if name in FOREST_MODELS else joblib.load(path)
+    models["symptom_predictor"] = DiseasePredictor(models["disease_predictor"], models["symptom_encoder"])
+    models["category_predictor"] = CategoryPredictor(
+        models["ml_model"], models["disease_encoder"], models["category_encoder"]
+    )
+    return Models((time.perf_counter() - start) * 1000, **models)
+
+
+def load_batch_predictor(model_dir=MODEL_DIR, n_jobs=-1):
+    import joblib
+
+    _register_tokenizer()
+    vectorizer = joblib.load(os.path.join(model_dir, MODEL_FILES["symptom_encoder"]))
+    forest = joblib.load(os.path.join(model_dir, MODEL_FILES["disease_predictor"]))
+    return BatchDiseasePredictor(forest, SymptomFeaturizer(vectorizer), n_jobs=n_jobs)
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+CACHE_DIR_NAME = "forest_cache"
+CACHE_FORMAT = 1
+ARRAYS = ("feature", "threshold", "left", "right", "value")
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ForestArrays:
+    # A fitted random forest flattened into a handful of plain arrays: every
+    # tree's nodes are concatenated, child links are absolute node indices,
+    # and leaves point back at themselves, so all trees can be walked
+    # together for exactly `depth` steps. Loaded with mmap_mode="r" the
+    # arrays are shared read-only through the page cache by every process
+    # that opens the same cache directory.
+
+    def __init__(self, arrays, roots, classes, depth, feature_names=None):
+        # Plain ndarray views of the maps: indexing an np.memmap wraps every
+        # result in another memmap, which dominates single-sample latency.
+        self.feature, self.threshold, self.left, self.right, self.value = (np.asarray(arrays[name]) for name in ARRAYS)
+        self.roots = roots
+        self.classes_ = classes
+        self.depth = depth
+        self.feature_names = feature_names
+
+    @classmethod
+    def from_forest(cls, forest):
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees[:-1]])
+
+        feature, threshold, left, right, value = [], [], [], [], []
+        for offset, tree in zip(offsets, trees):
+            nodes = np.arange(tree.node_count)
+            leaf = tree.children_left < 0
+            feature.append(np.where(leaf, 0, tree.feature))
+            threshold.append(np.where(leaf, 0.0, tree.threshold))
+            left.append(np.where(leaf, nodes, tree.children_left) + offset)
+            right.append(np.where(leaf, nodes, tree.children_right) + offset)
+            counts = tree.value[:, 0, :]
+            value.append(counts / counts.sum(axis=1, keepdims=True))
+
+        arrays = {
+            "feature": np.concatenate(feature).astype(np.int32),
+            "threshold": np.concatenate(threshold).astype(np.float64),
+            "left": np.concatenate(left).astype(np.int32),
+            "right": np.concatenate(right).astype(np.int32),
+            "value": np.concatenate(value).astype(np.float64),
+        }
+        feature_names = getattr(forest, "feature_names_in_", None)
+        return cls(arrays, offsets.astype(np.int32), np.asarray(forest.classes_),
+                   max(tree.max_depth for tree in trees),
+                   list(feature_names) if feature_names is not None else None)
+
+    def save(self, directory, source_digest):
+        for name in ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        np.save(os.path.join(directory, "roots.npy"), self.roots)
+        manifest = {
+            "format": CACHE_FORMAT,
+            "source_sha256": source_digest,
+            "depth": int(self.depth),
+            "classes": self.classes_.tolist(),
+            "feature_names": self.feature_names,
+        }
+        with open(os.path.join(directory, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        with open(os.path.join(directory, "manifest.json")) as f:
+            manifest = json.load(f)
+        if manifest.get("format") != CACHE_FORMAT:
+            raise ValueError(f"Unsupported forest cache format in {directory}")
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in ARRAYS}
+        return cls(arrays, np.load(os.path.join(directory, "roots.npy")),
+                   np.array(manifest["classes"]),
+                   manifest["depth"], manifest["feature_names"])
+
+    def predict_proba(self, X):
+        X = self._as_array(X)
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+        rows = np.arange(X.shape[0])[:, None]
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.value[nodes].mean(axis=1)
+
+    def predict_proba_one(self, x):
+        # x is one float32 feature row, already in feature_names order.
+        nodes = self.roots
+        for _ in range(self.depth):
+            nodes = np.where(x[self.feature[nodes]] <= self.threshold[nodes], self.left[nodes], self.right[nodes])
+        return self.value[nodes].mean(axis=0)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def _as_array(self, X):
+        if hasattr(X, "toarray"):
+            X = X.toarray()
+        elif self.feature_names is not None and hasattr(X, "columns"):
+            X = X[self.feature_names]
+        # The trees were split on float32 features, as sklearn compares them.
+        return np.atleast_2d(np.asarray(X, dtype=np.float32))
+
+
+def cache_path(model_path, digest):
+    name = os.path.splitext(os.path.basename(model_path))[0]
+    return os.path.join(os.path.dirname(model_path), CACHE_DIR_NAME, f"{name}-{digest[:16]}")
+
+
+def build_forest_cache(model_path, forest=None, digest=None):
+    # Written to a temporary sibling and renamed into place, so a process
+    # that finds the directory always finds it complete.
+    digest = digest or file_digest(model_path)
+    target = cache_path(model_path, digest)
+    if os.path.isdir(target):
+        return target
+
+    if forest is None:
+        import joblib
+        forest = joblib.load(model_path)
+    parent = os.path.dirname(target)
+    os.makedirs(parent, exist_ok=True)
+    # Not tempfile.mkdtemp: its 0700 mode would survive the rename and lock
+    # sessions running as other users out of the shared arrays.
+    staging = os.path.join(parent, f".building-{os.getpid()}-{uuid.uuid4().hex}")
+    os.mkdir(staging)
+    try:
+        ForestArrays.from_forest(forest).save(staging, digest)
+        os.rename(staging, target)
+    except OSError:
+        if not os.path.isdir(target):
+            raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    _prune_stale(model_path, target)
+    return target
+
+
+def load_forest(model_path, mmap_mode="r"):
+    # The cache directory is named after the pickle's content hash, so a
+    # retrained model never picks up arrays exported from the old one. If the
+    # cache cannot be built or read (e.g. owned by another user with a
+    # restrictive umask), the pickle is exported in memory instead.
+    try:
+        return ForestArrays.load(build_forest_cache(model_path), mmap_mode=mmap_mode)
+    except (OSError, ValueError) as e:
+        print(f"Forest cache unavailable for {model_path}, loading the pickle: {e}")
+        import joblib
+        return ForestArrays.from_forest(joblib.load(model_path))
+
+
+def _prune_stale(model_path, current):
+    name = os.path.splitext(os.path.basename(model_path))[0]
+    parent = os.path.dirname(current)
+    for entry in os.listdir(parent):
+        path = os.path.join(parent, entry)
+        if entry.startswith(f"{name}-") and path != current:
+            shutil.rmtree(path, ignore_errors=True)
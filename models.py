@@ -0,0 +1,96 @@
+import uuid
+from datetime import datetime, time
+from functools import lru_cache
+
+
+@lru_cache(maxsize=2048)
+def normalize_time_str(time_str):
+    # Older rows store 24h times such as "20:00"; the app works in "8:00 PM".
+    if ' ' in time_str:
+        return time_str
+    hour, minute = map(int, time_str.split(':'))
+    am_pm = "AM" if hour < 12 else "PM"
+    if hour > 12:
+        hour -= 12
+    elif hour == 0:
+        hour = 12
+    return f"{hour}:{minute:02d} {am_pm}"
+
+
+@lru_cache(maxsize=2048)
+def parse_time_str(time_str):
+    return datetime.strptime(time_str, "%I:%M %p").time()
+
+
+TIMES_OF_DAY = tuple(time(minute // 60, minute % 60) for minute in range(24 * 60))
+
+
+class User:
+    def __init__(self, username, password_hash, role="user", approved=False, user_id=None):
+        self.username = username
+        self.password_hash = password_hash
+        self.role = role
+        self.approved = approved
+        self.user_id = user_id if user_id else str(uuid.uuid4())
+
+
+class DirtyTracking:
+    # Objects start out dirty; the store marks them clean once their row is
+    # written, and any later assignment to a persisted field dirties them again.
+    # Only assignment is seen: after changing a persisted list in place, such
+    # as chronic_diseases.append(...), reassign it or call mark_dirty(), or
+    # the change is never saved.
+    # Constructors fill __dict__ directly so bulk loads don't pay for the hook.
+    persisted_fields = frozenset()
+    dirty = True
+
+    def __setattr__(self, name, value):
+        if name in self.persisted_fields:
+            object.__setattr__(self, "dirty", True)
+        object.__setattr__(self, name, value)
+
+    def mark_dirty(self):
+        object.__setattr__(self, "dirty", True)
+
+    def mark_clean(self):
+        object.__setattr__(self, "dirty", False)
+
+
+class Patient(DirtyTracking):
+    persisted_fields = frozenset(("name", "age", "gender", "medical_history", "chronic_diseases"))
+
+    def __init__(self, name, age, gender, medical_history, chronic_diseases, patient_id=None):
+        self.__dict__.update(
+            name=name,
+            age=age,
+            gender=gender,
+            medical_history=medical_history,
+            chronic_diseases=chronic_diseases,
+            patient_id=patient_id,
+            medicines=[]
+        )
+
+
+class Medicine(DirtyTracking):
+    persisted_fields = frozenset(("name", "dosage", "time_str", "disease", "is_diabetic", "category", "meal_timing"))
+
+    def __init__(self, name, dosage, time_str, disease, is_diabetic, patient, category, meal_timing, medicine_id=None,
+                 minute_of_day=None):
+        if minute_of_day is None:
+            time_obj = parse_time_str(time_str)
+            minute_of_day = time_obj.hour * 60 + time_obj.minute
+        else:
+            time_obj = TIMES_OF_DAY[minute_of_day]
+        self.__dict__.update(
+            name=name,
+            dosage=dosage,
+            time_str=time_str,
+            disease=disease,
+            is_diabetic=is_diabetic,
+            patient=patient,
+            category=category,
+            meal_timing=meal_timing,
+            medicine_id=medicine_id,
+            time_obj=time_obj,
+            minute_of_day=minute_of_day
+        )
@@ -0,0 +1,48 @@
+class PatientSearch:
+    # Ranked lookups over the patient_search FTS5 table, which triggers keep
+    # in step with patients and patient_conditions. An exact patient ID comes
+    # first, then exact and prefix name matches, then the rest by bm25 with
+    # name hits weighted over ID and condition hits.
+
+    def __init__(self, db, limit=200):
+        self.db = db
+        self.limit = limit
+        self._trigram = None
+
+    def search(self, text, limit=None):
+        limit = limit or self.limit
+        text = text.strip()
+        if not text:
+            return []
+
+        ids = []
+        if text.isdigit():
+            row = self.db.query_one("SELECT patient_id FROM patients WHERE patient_id = ?", (int(text),))
+            if row:
+                ids.append(row[0])
+
+        query = self._match_query(text.split())
+        if query:
+            rows = self.db.query(
+                "SELECT rowid FROM patient_search WHERE patient_search MATCH ? "
+                "ORDER BY name = ? COLLATE NOCASE DESC, name LIKE ? DESC, bm25(patient_search, 10.0, 5.0, 1.0) "
+                "LIMIT ?",
+                (query, text, text + "%", limit)
+            )
+        else:
+            # Shorter than one trigram: a name prefix scan that stops at `limit`.
+            rows = self.db.query(
+                "SELECT rowid FROM patient_search WHERE name LIKE ? LIMIT ?", (text + "%", limit)
+            )
+        ids.extend(patient_id for (patient_id,) in rows if patient_id not in ids)
+        return ids[:limit]
+
+    def _match_query(self, words):
+        if self._trigram is None:
+            row = self.db.query_one("SELECT sql FROM sqlite_master WHERE name = 'patient_search'")
+            self._trigram = bool(row) and "trigram" in row[0]
+
+        quoted = ['"' + word.replace('"', '""') + '"' for word in words if not self._trigram or len(word) >= 3]
+        if self._trigram:
+            return " ".join(quoted)
+        return " ".join(phrase + "*" for phrase in quoted)
@@ -0,0 +1,431 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from models import TIMES_OF_DAY, Medicine, Patient, normalize_time_str, parse_time_str
+
+PATIENT_COLUMNS = "patient_id, name, age, gender, medical_history"
+MEDICINE_COLUMNS = ("medicine_id, patient_id, name, dosage, time_str, disease, is_diabetic, category, meal_timing, "
+                    "minute_of_day")
+
+
+def patient_from_row(row):
+    patient = Patient(
+        name=row[1],
+        age=row[2],
+        gender=row[3],
+        medical_history=row[4],
+        chronic_diseases=[],
+        patient_id=row[0]
+    )
+    patient.mark_clean()
+    return patient
+
+
+def medicine_from_row(med_row, patient):
+    # minute_of_day is filled in by migration 3; only rows written by an older
+    # build since then still need their time_str parsed.
+    medicine = Medicine(
+        name=med_row[2],
+        dosage=med_row[3],
+        time_str=med_row[4] if med_row[9] is not None else normalize_time_str(med_row[4]),
+        disease=med_row[5],
+        is_diabetic=bool(med_row[6]),
+        patient=patient,
+        category=med_row[7],
+        meal_timing=med_row[8],
+        medicine_id=med_row[0],
+        minute_of_day=med_row[9]
+    )
+    medicine.mark_clean()
+    return medicine
+
+
+def attach_conditions(condition_rows, by_id):
+    for patient_id, condition in condition_rows:
+        patient = by_id.get(patient_id)
+        if patient is not None:
+            patient.chronic_diseases.append(condition)
+
+
+def attach_medicines(medicine_rows, by_id):
+    loaded = 0
+    for med_row in medicine_rows:
+        patient = by_id.get(med_row[1])
+        if patient is None:
+            continue
+        try:
+            patient.medicines.append(medicine_from_row(med_row, patient))
+            loaded += 1
+        except Exception as e:
+            print(f"Error loading medicine {med_row[2]}: {e}")
+    return loaded
+
+
+def load_patients(conn):
+    start = time.perf_counter()
+    cursor = conn.cursor()
+
+    cursor.execute(f"SELECT {PATIENT_COLUMNS} FROM patients ORDER BY patient_id")
+    patient_rows = cursor.fetchall()
+    cursor.execute("SELECT patient_id, condition FROM patient_conditions ORDER BY patient_id, position")
+    condition_rows = cursor.fetchall()
+    cursor.execute(f"SELECT {MEDICINE_COLUMNS} FROM medicines ORDER BY patient_id, medicine_id")
+    medicine_rows = cursor.fetchall()
+    queried = time.perf_counter()
+
+    patients = [patient_from_row(row) for row in patient_rows]
+    by_id = {patient.patient_id: patient for patient in patients}
+    attach_conditions(condition_rows, by_id)
+    loaded = attach_medicines(medicine_rows, by_id)
+    built = time.perf_counter()
+
+    stats = {
+        "patients": len(patients),
+        "medicines": loaded,
+        "skipped": len(medicine_rows) - loaded,
+        "query_ms": (queried - start) * 1000,
+        "build_ms": (built - queried) * 1000,
+        "total_ms": (built - start) * 1000,
+    }
+    return patients, stats
+
+
+class PatientRegistry:
+    # The eagerly loaded patients, keyed by id, with their medicines keyed by
+    # id as well. Every add and delete goes through here so the maps never
+    # drift from the patients' own medicine lists.
+
+    def __init__(self, patients=()):
+        self._lock = threading.RLock()
+        self._patients = {}
+        self._medicines = {}
+        for patient in patients:
+            self._index(patient)
+
+    def __len__(self):
+        return len(self._patients)
+
+    def __bool__(self):
+        return bool(self._patients)
+
+    def __iter__(self):
+        with self._lock:
+            patients = list(self._patients.values())
+        return iter(patients)
+
+    def get(self, patient_id):
+        return self._patients.get(patient_id)
+
+    def get_many(self, patient_ids):
+        return [patient for patient in map(self._patients.get, patient_ids) if patient is not None]
+
+    def get_medicine(self, medicine_id):
+        return self._medicines.get(medicine_id)
+
+    def append(self, patient):
+        with self._lock:
+            self._index(patient)
+
+    def remove(self, patient):
+        with self._lock:
+            self._patients.pop(patient.patient_id, None)
+            for medicine in patient.medicines:
+                self._medicines.pop(medicine.medicine_id, None)
+
+    def add_medicine(self, medicine):
+        with self._lock:
+            if medicine not in medicine.patient.medicines:
+                medicine.patient.medicines.append(medicine)
+            self._medicines[medicine.medicine_id] = medicine
+
+    def remove_medicine(self, medicine):
+        with self._lock:
+            self._medicines.pop(medicine.medicine_id, None)
+            medicine.patient.medicines = [m for m in medicine.patient.medicines if m is not medicine]
+
+    def _index(self, patient):
+        self._patients[patient.patient_id] = patient
+        for medicine in patient.medicines:
+            self._medicines[medicine.medicine_id] = medicine
+
+
+class PatientWriter:
+    def __init__(self, db):
+        self.db = db
+        self.last_writes = 0
+        self.last_ms = 0.0
+        self.total_writes = 0
+
+    def save(self, patient, medicines=None):
+        # Callers on another thread pass a snapshot of patient.medicines, so
+        # the Tk thread can keep editing the live list during the write.
+        start = time.perf_counter()
+        medicines = list(patient.medicines) if medicines is None else medicines
+        writes, changed, added = self.db.transaction(self._write_rows, patient, medicines)
+
+        patient.mark_clean()
+        for medicine in changed + added:
+            medicine.mark_clean()
+
+        self.last_writes = writes
+        self.last_ms = (time.perf_counter() - start) * 1000
+        self.total_writes += writes
+        return writes
+
+    def _write_rows(self, conn, patient, medicines):
+        writes = 0
+        cursor = conn.cursor()
+        if not patient.patient_id:
+            cursor.execute('''
+                INSERT INTO patients (name, age, gender, medical_history, chronic_diseases)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (patient.name, patient.age, patient.gender, patient.medical_history,
+                  ','.join(patient.chronic_diseases)))
+            patient.patient_id = cursor.lastrowid
+            writes += 1 + self._write_conditions(cursor, patient)
+        elif patient.dirty:
+            cursor.execute('''
+                UPDATE patients SET name = ?, age = ?, gender = ?, medical_history = ?, chronic_diseases = ?
+                WHERE patient_id = ?
+            ''', (patient.name, patient.age, patient.gender, patient.medical_history,
+                  ','.join(patient.chronic_diseases), patient.patient_id))
+            writes += 1 + self._write_conditions(cursor, patient)
+
+        changed = [m for m in medicines if m.medicine_id and m.dirty]
+        if changed:
+            cursor.executemany('''
+                UPDATE medicines SET name = ?, dosage = ?, time_str = ?, disease = ?,
+                is_diabetic = ?, category = ?, meal_timing = ?, minute_of_day = ?
+                WHERE medicine_id = ?
+            ''', [(m.name, m.dosage, m.time_str, m.disease, m.is_diabetic, m.category,
+                   m.meal_timing, m.minute_of_day, m.medicine_id) for m in changed])
+            writes += len(changed)
+
+        # Inserts go one at a time because each new row's id is needed.
+        added = [m for m in medicines if not m.medicine_id]
+        for medicine in added:
+            cursor.execute('''
+                INSERT INTO medicines (patient_id, name, dosage, time_str, disease, is_diabetic, category, meal_timing,
+                                       minute_of_day)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (patient.patient_id, medicine.name, medicine.dosage, medicine.time_str,
+                  medicine.disease, medicine.is_diabetic, medicine.category, medicine.meal_timing,
+                  medicine.minute_of_day))
+            medicine.medicine_id = cursor.lastrowid
+            writes += 1
+
+        return writes, changed, added
+
+    def _write_conditions(self, cursor, patient):
+        cursor.execute("DELETE FROM patient_conditions WHERE patient_id = ?", (patient.patient_id,))
+        cursor.executemany(
+            "INSERT INTO patient_conditions (patient_id, position, condition) VALUES (?, ?, ?)",
+            [(patient.patient_id, position, condition) for position, condition in enumerate(patient.chronic_diseases)]
+        )
+        return len(patient.chronic_diseases)
+
+
+class PatientPages:
+    # Paged patient rows for list views: (patient_id, (patient_id, name, age,
+    # gender, conditions, medicine count)). Either every patient in ID order,
+    # or just the given IDs in the order given, e.g. ranked search results.
+    columns = ("ID", "Name", "Age", "Gender", "Chronic Diseases", "Medicines")
+
+    def __init__(self, db, patient_ids=None):
+        self.db = db
+        self.patient_ids = patient_ids
+
+    def count(self):
+        if self.patient_ids is not None:
+            return len(self.patient_ids)
+        return self.db.query_one("SELECT COUNT(*) FROM patients")[0]
+
+    def fetch(self, offset, limit):
+        if self.patient_ids is None:
+            rows = self.db.query(f"{self._select()} ORDER BY p.patient_id LIMIT ? OFFSET ?", (limit, offset))
+        else:
+            ids = self.patient_ids[offset:offset + limit]
+            placeholders = ",".join("?" * len(ids))
+            by_id = {row[0]: row for row in
+                     self.db.query(f"{self._select()} WHERE p.patient_id IN ({placeholders})", ids)}
+            rows = [by_id[patient_id] for patient_id in ids if patient_id in by_id]
+        return [(row[0], row[:4] + (row[4] or "None", row[5])) for row in rows]
+
+    def _select(self):
+        return '''
+            SELECT p.patient_id, p.name, p.age, p.gender,
+                   (SELECT group_concat(condition, ', ') FROM (
+                        SELECT condition FROM patient_conditions c
+                        WHERE c.patient_id = p.patient_id ORDER BY position)),
+                   (SELECT COUNT(*) FROM medicines m WHERE m.patient_id = p.patient_id)
+            FROM patients p'''
+
+
+class DoseRef:
+    # Just enough of a medicine for the reminder index; the full Medicine
+    # and its Patient are only loaded when the dose is actually due.
+    __slots__ = ("medicine_id", "patient_id", "time_obj")
+
+    def __init__(self, medicine_id, patient_id, time_obj):
+        self.medicine_id = medicine_id
+        self.patient_id = patient_id
+        self.time_obj = time_obj
+
+
+class LazyPatientList:
+    def __init__(self, db, page_size=500, cache_size=2000):
+        self.db = db
+        self._lock = threading.RLock()
+        self.page_size = page_size
+        self.cache_size = cache_size
+        self._count = None
+        self._recent = OrderedDict()
+        # Patients still referenced elsewhere (current patient, open windows,
+        # reminder popups) keep their identity instead of being reloaded.
+        self._live = weakref.WeakValueDictionary()
+
+    def __len__(self):
+        with self._lock:
+            if self._count is None:
+                self._count = self.db.reader().execute("SELECT COUNT(*) FROM patients").fetchone()[0]
+            return self._count
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __iter__(self):
+        last_id = -1
+        while True:
+            with self._lock:
+                rows = self.db.reader().execute(
+                    f"SELECT {PATIENT_COLUMNS} FROM patients WHERE patient_id > ? ORDER BY patient_id LIMIT ?",
+                    (last_id, self.page_size)
+                ).fetchall()
+                if not rows:
+                    return
+                patients = self._materialise(rows)
+            yield from patients
+            last_id = rows[-1][0]
+
+    def page(self, offset, limit):
+        with self._lock:
+            rows = self.db.reader().execute(
+                f"SELECT {PATIENT_COLUMNS} FROM patients ORDER BY patient_id LIMIT ? OFFSET ?",
+                (limit, offset)
+            ).fetchall()
+            return self._materialise(rows)
+
+    def get(self, patient_id):
+        patients = self.get_many([patient_id])
+        return patients[0] if patients else None
+
+    def get_many(self, patient_ids):
+        with self._lock:
+            missing = [patient_id for patient_id in patient_ids if self._cached(patient_id) is None]
+            for i in range(0, len(missing), self.page_size):
+                chunk = missing[i:i + self.page_size]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.db.reader().execute(
+                    f"SELECT {PATIENT_COLUMNS} FROM patients WHERE patient_id IN ({placeholders})", chunk
+                ).fetchall()
+                self._materialise(rows)
+            return [patient for patient in map(self._cached, patient_ids) if patient is not None]
+
+    def append(self, patient):
+        with self._lock:
+            self._remember(patient)
+            if self._count is not None:
+                self._count += 1
+
+    def remove(self, patient):
+        with self._lock:
+            self._recent.pop(patient.patient_id, None)
+            self._live.pop(patient.patient_id, None)
+            self._count = None
+
+    def get_medicine(self, medicine_id):
+        row = self.db.reader().execute("SELECT patient_id FROM medicines WHERE medicine_id = ?", (medicine_id,)).fetchone()
+        patient = self.get(row[0]) if row else None
+        if patient is None:
+            return None
+        return {medicine.medicine_id: medicine for medicine in patient.medicines}.get(medicine_id)
+
+    def add_medicine(self, medicine):
+        with self._lock:
+            if medicine not in medicine.patient.medicines:
+                medicine.patient.medicines.append(medicine)
+
+    def remove_medicine(self, medicine):
+        with self._lock:
+            medicine.patient.medicines = [m for m in medicine.patient.medicines if m is not medicine]
+
+    def dose_refs(self):
+        with self._lock:
+            rows = self.db.reader().execute(
+                "SELECT medicine_id, patient_id, minute_of_day, time_str FROM medicines"
+            ).fetchall()
+        for medicine_id, patient_id, minute, time_str in rows:
+            try:
+                time_obj = TIMES_OF_DAY[minute] if minute is not None else parse_time_str(normalize_time_str(time_str))
+                yield DoseRef(medicine_id, patient_id, time_obj)
+            except Exception as e:
+                print(f"Error indexing medicine {medicine_id}: {e}")
+
+    def resolve(self, entries):
+        refs = [entry for entry in entries if isinstance(entry, DoseRef)]
+        if refs:
+            self.get_many(list(dict.fromkeys(ref.patient_id for ref in refs)))
+        medicines = []
+        by_id = {}
+        for entry in entries:
+            if isinstance(entry, DoseRef):
+                patient = self.get(entry.patient_id)
+                if patient is not None and patient.patient_id not in by_id:
+                    by_id[patient.patient_id] = {m.medicine_id: m for m in patient.medicines}
+                entry = by_id[patient.patient_id].get(entry.medicine_id) if patient else None
+            if entry is not None:
+                medicines.append(entry)
+        return medicines
+
+    def _cached(self, patient_id):
+        patient = self._live.get(patient_id)
+        if patient is not None:
+            self._remember(patient)
+        return patient
+
+    def _remember(self, patient):
+        self._live[patient.patient_id] = patient
+        self._recent[patient.patient_id] = patient
+        self._recent.move_to_end(patient.patient_id)
+        while len(self._recent) > self.cache_size:
+            self._recent.popitem(last=False)
+
+    def _materialise(self, rows):
+        patients = []
+        fresh = {}
+        for row in rows:
+            patient = self._live.get(row[0])
+            if patient is None:
+                patient = patient_from_row(row)
+                fresh[patient.patient_id] = patient
+            patients.append(patient)
+
+        if fresh:
+            ids = list(fresh)
+            placeholders = ",".join("?" * len(ids))
+            condition_rows = self.db.reader().execute(
+                f"SELECT patient_id, condition FROM patient_conditions WHERE patient_id IN ({placeholders}) "
+                f"ORDER BY patient_id, position", ids
+            ).fetchall()
+            attach_conditions(condition_rows, fresh)
+            medicine_rows = self.db.reader().execute(
+                f"SELECT {MEDICINE_COLUMNS} FROM medicines WHERE patient_id IN ({placeholders}) "
+                f"ORDER BY patient_id, medicine_id", ids
+            ).fetchall()
+            attach_medicines(medicine_rows, fresh)
+
+        for patient in patients:
+            self._remember(patient)
+        return patients
@@ -0,0 +1,59 @@
+import threading
+
+from reminder_index import MINUTES_PER_DAY
+
+
+class ReminderLog:
+    # Remembers which (medicine, day, minute) reminders have already fired.
+    # Only the current day is kept in memory, as one int per dose, and the
+    # rows are mirrored to SQLite so a restart within the same minute neither
+    # repeats a reminder that fired nor loses one that was claimed but not
+    # yet shown.
+
+    def __init__(self, db):
+        self._lock = threading.Lock()
+        self.db = db
+        self._day = None
+        self._seen = set()
+
+    def __len__(self):
+        return len(self._seen)
+
+    def __contains__(self, key):
+        medicine_id, day, minute = key
+        return day == self._day and self._key(medicine_id, minute) in self._seen
+
+    def claim(self, day, minute, medicine_ids):
+        with self._lock:
+            self._roll_over(day)
+            claimed = []
+            for medicine_id in medicine_ids:
+                key = self._key(medicine_id, minute)
+                if key not in self._seen:
+                    self._seen.add(key)
+                    claimed.append(medicine_id)
+            if claimed:
+                self.db.executemany(
+                    "INSERT OR IGNORE INTO reminder_log (medicine_id, day, minute, fired) VALUES (?, ?, ?, 0)",
+                    [(medicine_id, day, minute) for medicine_id in claimed]
+                )
+            return claimed
+
+    def mark_fired(self, day, minute, medicine_id):
+        self.db.execute(
+            "UPDATE reminder_log SET fired = 1 WHERE medicine_id = ? AND day = ? AND minute = ?",
+            (medicine_id, day, minute)
+        )
+
+    def _key(self, medicine_id, minute):
+        return medicine_id * MINUTES_PER_DAY + minute
+
+    def _roll_over(self, day):
+        if day == self._day:
+            return
+        self._day = day
+        self.db.execute("DELETE FROM reminder_log WHERE day < ?", (day,))
+        rows = self.db.query(
+            "SELECT medicine_id, minute FROM reminder_log WHERE day = ? AND fired = 1", (day,)
+        )
+        self._seen = {self._key(medicine_id, minute) for medicine_id, minute in rows}
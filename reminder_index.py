@@ -0,0 +1,110 @@
+import bisect
+import threading
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def minute_of_day(time_obj):
+    return time_obj.hour * 60 + time_obj.minute
+
+
+class ReminderIndex:
+    # Doses bucketed by minute of day, with the occupied minutes kept sorted
+    # so the day's schedule, or any slice of it, is read in time order
+    # without sorting.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._minutes = {}
+        self._sorted = []
+        self._listeners = []
+
+    def __len__(self):
+        return len(self._minutes)
+
+    def __contains__(self, medicine):
+        return medicine.medicine_id in self._minutes
+
+    def add(self, medicine):
+        medicine_id = medicine.medicine_id
+        minute = minute_of_day(medicine.time_obj)
+        with self._lock:
+            old_minute = self._minutes.get(medicine_id)
+            if old_minute is not None and old_minute != minute:
+                self._discard(medicine_id, old_minute)
+            bucket = self._buckets.get(minute)
+            if bucket is None:
+                bucket = self._buckets[minute] = {}
+                bisect.insort(self._sorted, minute)
+            bucket[medicine_id] = medicine
+            self._minutes[medicine_id] = minute
+        if old_minute != minute:
+            self._notify()
+
+    def remove(self, medicine):
+        with self._lock:
+            minute = self._minutes.pop(medicine.medicine_id, None)
+            if minute is None:
+                return
+            self._discard(medicine.medicine_id, minute)
+        self._notify()
+
+    def remove_patient(self, patient):
+        for medicine in patient.medicines:
+            self.remove(medicine)
+
+    def rebuild(self, patients):
+        self.rebuild_from(medicine for patient in patients for medicine in patient.medicines)
+
+    def rebuild_from(self, medicines):
+        with self._lock:
+            self._buckets = {}
+            self._minutes = {}
+            for medicine in medicines:
+                minute = minute_of_day(medicine.time_obj)
+                self._buckets.setdefault(minute, {})[medicine.medicine_id] = medicine
+                self._minutes[medicine.medicine_id] = minute
+            self._sorted = sorted(self._buckets)
+        self._notify()
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def minutes(self):
+        with self._lock:
+            return list(self._sorted)
+
+    def window(self, start, end):
+        # (minute, dose) pairs with start <= minute < end, in time order. The
+        # window may run past midnight and then continues from 00:00.
+        length = min(end - start, MINUTES_PER_DAY)
+        start %= MINUTES_PER_DAY
+        if start + length <= MINUTES_PER_DAY:
+            spans = ((start, start + length),)
+        else:
+            spans = ((start, MINUTES_PER_DAY), (0, start + length - MINUTES_PER_DAY))
+
+        entries = []
+        with self._lock:
+            for low, high in spans:
+                for minute in self._sorted[bisect.bisect_left(self._sorted, low):bisect.bisect_left(self._sorted, high)]:
+                    entries.extend((minute, entry) for entry in self._buckets[minute].values())
+        return entries
+
+    def due(self, minute):
+        with self._lock:
+            bucket = self._buckets.get(minute)
+            return list(bucket.values()) if bucket else []
+
+    def _notify(self):
+        for callback in self._listeners:
+            callback()
+
+    def _discard(self, medicine_id, minute):
+        bucket = self._buckets.get(minute)
+        if bucket is not None:
+            bucket.pop(medicine_id, None)
+            if not bucket:
+                del self._buckets[minute]
+                del self._sorted[bisect.bisect_left(self._sorted, minute)]
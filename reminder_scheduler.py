@@ -0,0 +1,113 @@
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+
+from reminder_index import minute_of_day
+
+ONE_MINUTE = timedelta(minutes=1)
+ONE_DAY = timedelta(days=1)
+
+
+class ReminderPoller:
+    def __init__(self, index, on_due, interval=1):
+        self.index = index
+        self.on_due = on_due
+        self.interval = interval
+        self.wakeups = 0
+        self._stop_event = threading.Event()
+
+    def notify(self):
+        pass
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        last_minute_checked = -1
+
+        while not self._stop_event.is_set():
+            try:
+                now = datetime.now()
+                current_minute = minute_of_day(now)
+
+                if current_minute != last_minute_checked:
+                    last_minute_checked = current_minute
+                    self.on_due(now, current_minute)
+
+                self._stop_event.wait(self.interval)
+                self.wakeups += 1
+            except Exception as e:
+                print(f"Error in reminder thread: {e}")
+                time.sleep(5)
+
+
+class ReminderScheduler:
+    def __init__(self, index, on_due, max_sleep=300):
+        self.index = index
+        self.on_due = on_due
+        # Upper bound on a single wait so wall-clock changes (suspend, DST,
+        # manual adjustments) are noticed without polling every second.
+        self.max_sleep = max_sleep
+        self.wakeups = 0
+        self._cond = threading.Condition()
+        self._heap = []
+        self._dirty = True
+        self._stopped = False
+        index.subscribe(self.notify)
+
+    def notify(self):
+        with self._cond:
+            self._dirty = True
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def run(self):
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                now = datetime.now()
+                if self._dirty:
+                    self._rebuild(now)
+                due_minute = self._pop_due(now)
+                if due_minute is None:
+                    self._cond.wait(self._timeout(now))
+                    self.wakeups += 1
+                    continue
+
+            try:
+                self.on_due(now, due_minute)
+            except Exception as e:
+                print(f"Error in reminder thread: {e}")
+
+    def _rebuild(self, now):
+        minute_start = now.replace(second=0, microsecond=0)
+        current_minute = minute_of_day(now)
+        heap = []
+        for minute in self.index.minutes():
+            fire_at = minute_start + timedelta(minutes=minute - current_minute)
+            if fire_at < minute_start:
+                fire_at += ONE_DAY
+            heap.append((fire_at, minute))
+        heapq.heapify(heap)
+        self._heap = heap
+        self._dirty = False
+
+    def _pop_due(self, now):
+        while self._heap and self._heap[0][0] <= now:
+            fire_at, minute = heapq.heapreplace(self._heap, (self._heap[0][0] + ONE_DAY, self._heap[0][1]))
+            # Doses whose minute has already passed (e.g. after the machine
+            # slept) are skipped, matching what the poller would have done.
+            if now - fire_at < ONE_MINUTE:
+                return minute
+        return None
+
+    def _timeout(self, now):
+        if not self._heap:
+            return self.max_sleep
+        return max(0.0, min(self.max_sleep, (self._heap[0][0] - now).total_seconds()))
@@ -0,0 +1,141 @@
+import bisect
+import queue
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class LatencyHistogram:
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms):
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, fraction):
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return self.bounds[i] if i < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def summary(self):
+        if not self.count:
+            return "no samples"
+        return (f"n={self.count} mean={self.total_ms / self.count:.1f}ms "
+                f"p50<={self.percentile(0.5):g}ms p95<={self.percentile(0.95):g}ms max={self.max_ms:.1f}ms")
+
+
+class TaskHandle:
+    def __init__(self, name, future, owner, quiet=False):
+        self.name = name
+        self.future = future
+        self.owner = owner
+        self.quiet = quiet
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        self.future.cancel()
+
+
+class TaskRunner:
+    # Runs blocking work (SQLite, model inference) on a thread pool and hands
+    # the result back to the Tk thread. Completed tasks are queued by the
+    # workers and drained by a root.after pump that only runs while work is
+    # pending, so Tk is only ever touched from its own thread.
+
+    def __init__(self, root, max_workers=4, on_busy_change=None, poll_ms=30):
+        self.root = root
+        self.on_busy_change = on_busy_change
+        self.poll_ms = poll_ms
+        self.histograms = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task")
+        self._done = queue.Queue()
+        self._pending = {}
+        self._pumping = False
+        self._lock = threading.Lock()
+
+    def run(self, name, fn, *args, on_done=None, on_error=None, owner=None, quiet=False):
+        # quiet tasks (e.g. warming caches at startup) don't show as busy.
+        future = self._executor.submit(self._timed, name, fn, args)
+        handle = TaskHandle(name, future, owner, quiet)
+        self._pending[future] = (handle, on_done, on_error)
+        future.add_done_callback(self._done.put)
+
+        if owner is not None:
+            owner.bind("<Destroy>", lambda event: event.widget is owner and handle.cancel(), add="+")
+
+        self._busy_changed()
+        if not self._pumping:
+            self._pumping = True
+            self.root.after(self.poll_ms, self._pump)
+        return handle
+
+    def busy(self):
+        return [handle.name for handle, _, _ in self._pending.values() if not handle.cancelled and not handle.quiet]
+
+    def shutdown(self):
+        for handle, _, _ in list(self._pending.values()):
+            handle.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _timed(self, name, fn, args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self.histograms.setdefault(name, LatencyHistogram()).record(elapsed_ms)
+
+    def _pump(self):
+        while True:
+            try:
+                future = self._done.get_nowait()
+            except queue.Empty:
+                break
+            handle, on_done, on_error = self._pending.pop(future)
+            try:
+                self._deliver(handle, future, on_done, on_error)
+            except Exception as e:
+                print(f"Error handling result of {handle.name}: {e}")
+            self._busy_changed()
+
+        if self._pending:
+            self.root.after(self.poll_ms, self._pump)
+        else:
+            self._pumping = False
+
+    def _deliver(self, handle, future, on_done, on_error):
+        if handle.cancelled or (handle.owner is not None and not handle.owner.winfo_exists()):
+            return
+        try:
+            result = future.result()
+        except CancelledError:
+            return
+        except Exception as e:
+            if on_error:
+                on_error(e)
+            else:
+                print(f"Error in background task {handle.name}: {e}")
+            return
+        if on_done:
+            on_done(result)
+
+    def _busy_changed(self):
+        if self.on_busy_change:
+            self.on_busy_change(self.busy())
@@ -8,9 +8,9 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
 import joblib
 
-# Define tokenizer function to replace lambda
-def symptom_tokenizer(text):
-    return [s.strip() for s in text.split(",")]
+# Tokenizer lives in ml_models so the app can unpickle the vectorizer
+from ml_models import symptom_tokenizer
+from model_cache import build_forest_cache
 
 # Create directory for models if it doesn't exist
 MODEL_DIR = "medicine_model"
@@ -95,6 +95,7 @@ print(f"Disease Prediction Accuracy: {accuracy_score(y_test_d, y_pred_d):.2f}")
 
 # Save disease prediction model and vectorizer
 joblib.dump(disease_predictor, os.path.join(MODEL_DIR, "disease_predictor.pkl"))
+build_forest_cache(os.path.join(MODEL_DIR, "disease_predictor.pkl"), disease_predictor)
 joblib.dump(vectorizer, os.path.join(MODEL_DIR, "symptom_encoder.pkl"))
 
 # 3. Generate Synthetic Dataset for Medicine Category Prediction
@@ -154,6 +155,7 @@ print(f"Medicine Category Prediction Accuracy: {accuracy_score(y_test_m, y_pred_
 
 # Save medicine prediction model and encoders
 joblib.dump(medicine_predictor, os.path.join(MODEL_DIR, "medicine_predictor.pkl"))
+build_forest_cache(os.path.join(MODEL_DIR, "medicine_predictor.pkl"), medicine_predictor)
 joblib.dump(disease_encoder, os.path.join(MODEL_DIR, "disease_encoder.pkl"))
 joblib.dump(category_encoder, os.path.join(MODEL_DIR, "category_encoder.pkl"))
 
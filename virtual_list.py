@@ -0,0 +1,193 @@
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import ttk
+
+
+class ListSource:
+    # Row source over an in-memory sequence. `prepare` runs on each fetched
+    # slice only, e.g. to resolve lazily loaded doses a page at a time.
+
+    def __init__(self, items, row, key=None, prepare=None):
+        self.items = items
+        self.row = row
+        self.key = key
+        self.prepare = prepare
+
+    def count(self):
+        return len(self.items)
+
+    def fetch(self, offset, limit):
+        items = self.items[offset:offset + limit]
+        if self.prepare:
+            items = self.prepare(items)
+        return [(self.key(item) if self.key else offset + i, self.row(item)) for i, item in enumerate(items)]
+
+
+class VirtualTreeview(ttk.Frame):
+    # A Treeview that only ever holds the rows on screen. Rows come from a
+    # source with count() and fetch(offset, limit), a page at a time with a
+    # few pages cached, and the scrollbar tracks the row offset instead of
+    # the tree. Visible rows are fixed item slots whose values are swapped
+    # as the list scrolls; selection is kept by source key, so it survives
+    # rows scrolling out of view.
+
+    def __init__(self, master, columns, source, height=15, page_size=100, cache_pages=8, column_width=100,
+                 selectmode="browse", displaycolumns="#all"):
+        super().__init__(master)
+        self.source = source
+        self.page_size = page_size
+        self.cache_pages = cache_pages
+        self.visible = height
+        self.offset = 0
+        self.total = 0
+        self._pages = OrderedDict()
+        self._slots = {}
+        self._selected = {}
+
+        self.tree = ttk.Treeview(self, columns=columns, displaycolumns=displaycolumns, show="headings", height=height,
+                                 selectmode=selectmode)
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=column_width, anchor=tk.W)
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda event: self._scroll_and_break(self.offset - 3))
+        self.tree.bind("<Button-5>", lambda event: self._scroll_and_break(self.offset + 3))
+        self.tree.bind("<Up>", lambda event: self._move(-1))
+        self.tree.bind("<Down>", lambda event: self._move(1))
+        self.tree.bind("<Prior>", lambda event: self._move(-self.visible))
+        self.tree.bind("<Next>", lambda event: self._move(self.visible))
+        self.tree.bind("<Home>", lambda event: self._move(-self.total))
+        self.tree.bind("<End>", lambda event: self._move(self.total))
+
+        self.refresh()
+
+    def refresh(self, source=None):
+        if source is not None:
+            self.source = source
+            self.offset = 0
+            self._selected = {}
+        self._pages.clear()
+        self.total = self.source.count()
+        self.offset = max(0, min(self.offset, self.total - self.visible))
+        self._render()
+
+    def selection(self):
+        return list(self._selected)
+
+    def scroll_to(self, offset):
+        offset = max(0, min(int(offset), self.total - self.visible))
+        if offset != self.offset:
+            self.offset = offset
+            self._render()
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * self.total)
+        elif args[0] == "scroll":
+            step = self.visible if args[2] == "pages" else 1
+            self.scroll_to(self.offset + int(args[1]) * step)
+
+    def bind_row(self, sequence, callback):
+        def handler(event):
+            slot = self.tree.identify_row(event.y)
+            if slot in self._slots:
+                callback(self._slots[slot][1])
+        self.tree.bind(sequence, handler, add="+")
+
+    def _rows(self, offset, count):
+        rows = []
+        index = offset
+        end = min(offset + count, self.total)
+        while index < end:
+            page_no = index // self.page_size
+            start = index - page_no * self.page_size
+            chunk = self._page(page_no)[start:start + end - index]
+            if not chunk:
+                break
+            rows.extend(chunk)
+            index += len(chunk)
+        return rows
+
+    def _page(self, page_no):
+        page = self._pages.get(page_no)
+        if page is None:
+            page = self._pages[page_no] = self.source.fetch(page_no * self.page_size, self.page_size)
+            while len(self._pages) > self.cache_pages:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page_no)
+        return page
+
+    def _render(self):
+        rows = self._rows(self.offset, self.visible)
+        self._slots = {}
+        for i, (key, values) in enumerate(rows):
+            slot = str(i)
+            if self.tree.exists(slot):
+                self.tree.item(slot, values=values)
+            else:
+                self.tree.insert("", tk.END, iid=slot, values=values)
+            self._slots[slot] = (self.offset + i, key)
+        for slot in self.tree.get_children()[len(rows):]:
+            self.tree.delete(slot)
+
+        self.tree.selection_set([slot for slot, (_, key) in self._slots.items() if key in self._selected])
+        if self.total:
+            self.scrollbar.set(self.offset / self.total, min(1.0, (self.offset + self.visible) / self.total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _on_select(self, event):
+        # Rows off screen keep their selection; rows on screen follow the tree.
+        current = {self._slots[slot][1]: None for slot in self.tree.selection() if slot in self._slots}
+        if current and str(self.tree.cget("selectmode")) == "browse":
+            self._selected = current
+            return
+        shown = {key for _, key in self._slots.values()}
+        self._selected = {key: None for key in self._selected if key not in shown}
+        self._selected.update(current)
+
+    def _on_resize(self, event):
+        first = self.tree.bbox("0") if self.tree.exists("0") else None
+        if not first:
+            return
+        _, top, _, row_height = first
+        visible = max(1, (event.height - top) // row_height)
+        if visible != self.visible:
+            self.visible = visible
+            self.offset = max(0, min(self.offset, self.total - self.visible))
+            self._render()
+
+    def _on_wheel(self, event):
+        steps = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self._scroll_and_break(self.offset - steps * 3)
+
+    def _scroll_and_break(self, offset):
+        self.scroll_to(offset)
+        return "break"
+
+    def _move(self, delta):
+        if not self.total:
+            return "break"
+        focus = self.tree.focus()
+        index = self._slots[focus][0] if focus in self._slots else self.offset - (1 if delta > 0 else 0)
+        index = max(0, min(index + delta, self.total - 1))
+        if index < self.offset:
+            self.scroll_to(index)
+        elif index >= self.offset + self.visible:
+            self.scroll_to(index - self.visible + 1)
+
+        slot = str(index - self.offset)
+        if slot in self._slots:
+            self._selected = {self._slots[slot][1]: None}
+            self.tree.selection_set(slot)
+            self.tree.focus(slot)
+            self.tree.see(slot)
+        return "break"